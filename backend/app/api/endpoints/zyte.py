@@ -0,0 +1,31 @@
+from fastapi import APIRouter, HTTPException
+import logging
+import secrets
+
+from app.core.config import settings
+from app.models.schema import JobFinishedPayload
+from app.services.zyte_manager import get_zyte_router
+
+logger = logging.getLogger(__name__)
+
+# Only mounted when settings.scraper.job_webhook_active (enabled with a token)
+router = APIRouter()
+
+@router.post("/zyte/job-finished")
+async def zyte_job_finished(payload: JobFinishedPayload, token: str = ""):
+    """Scrapy Cloud job-finished webhook: wakes the scrape waiting on that job"""
+    expected = settings.scraper.JOB_WEBHOOK_TOKEN or ""
+    if not expected or not secrets.compare_digest(token, expected):
+        raise HTTPException(status_code=403, detail="Invalid webhook token")
+    
+    job_id = payload.job or payload.jobid or payload.key
+    if not job_id:
+        raise HTTPException(status_code=400, detail="Missing job id")
+    
+    # Scrapy Cloud reports "finished" for every ended job; close_reason says whether it went well
+    succeeded = payload.state == "finished" and payload.close_reason == "finished"
+    delivered = get_zyte_router().notify_job_finished(str(job_id), succeeded)
+    if not delivered:
+        logger.info(f"Job-finished webhook for {job_id} had no waiting scrape")
+    
+    return {"status": "ok", "delivered": delivered}
@@ -34,8 +34,25 @@ class PlagiarismSettings(BaseSettings):
     
     # Performance settings
     MAX_SENTENCES_PER_SOURCE: int = 800  # Max sentences to analyze per source
+    USE_LSH_PREFILTER: bool = False  # Only encode source sentences that MinHash-LSH pairs with the text (needs datasketch)
+    USE_ONNX_INT8: bool = False  # Run the embedding model as INT8 ONNX on CPU (needs sentence-transformers[onnx])
     SENTENCE_MIN_LENGTH: int = 15  # Min sentence length to consider
 
+class ScraperSettings(BaseSettings):
+    """Settings for the scraping pipeline"""
+    # Delay before each spider queue task; per-host limits already live in ZyteServiceRouter
+    QUEUE_DELAY_S: float = 0.0
+    # Nameservers for the aiodns resolver (used when aiodns is installed); empty means the system ones
+    DNS_NAMESERVERS: List[str] = ["1.1.1.1", "8.8.8.8"]
+    # Scrapy Cloud calls POST {API_V1_STR}/zyte/job-finished when a job ends, instead of us polling
+    JOB_WEBHOOK_ENABLED: bool = False
+    JOB_WEBHOOK_TOKEN: Optional[str] = None  # Required ?token= on webhook calls; the webhook stays off without it
+    
+    @property
+    def job_webhook_active(self) -> bool:
+        """The webhook is only mounted (and polling only skipped) when it is enabled with a token"""
+        return self.JOB_WEBHOOK_ENABLED and bool(self.JOB_WEBHOOK_TOKEN)
+
 class Settings(BaseSettings):
     # Project settings
     PROJECT_NAME: str = "PureText AI"
@@ -53,6 +70,7 @@ class Settings(BaseSettings):
     # API keys with proper annotations
     ZYTE_API_KEY: Optional[str] = None
     ZYTE_PROJECT_ID: Optional[str] = None
+    ZYTE_MAX_CONCURRENCY: int = 10  # Max in-flight scrapes across all requests
     GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY", "")
     GOOGLE_CSE_ID: str = os.getenv("GOOGLE_CSE_ID", "e2d9b097c28dd4c41")
     
@@ -63,6 +81,9 @@ class Settings(BaseSettings):
     # Plagiarism detection settings
     plagiarism: PlagiarismSettings = PlagiarismSettings()
     
+    # Scraper settings
+    scraper: ScraperSettings = ScraperSettings()
+    
     # Model settings
     EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
     
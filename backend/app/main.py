@@ -1,14 +1,22 @@
 import logging
 import sys
 import os
+import asyncio
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from contextlib import asynccontextmanager
 
+try:
+    # libuv-backed event loop for the scraper's I/O fan-out; not available on Windows
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    uvloop = None
+
 from app.core.config import settings
-from app.api.endpoints import plagiarism, analyze
+from app.api.endpoints import plagiarism, analyze, zyte
 from app.api.endpoints import test
 
 @asynccontextmanager
@@ -16,17 +24,31 @@ async def lifespan(app: FastAPI):
     # Startup: Initialize services on startup
     from app.services.spider_queue import init_spider_queue
     from app.services.scraping import initialize_playwright_check
+    from app.services.zyte_manager import get_zyte_router
+    from app.services.embedding import get_embedding_model
+    from app.services.similarity import TORCH_THREADS
+    import torch
+    
+    # Split the cores between the scoring workers' torch ops, before the model first runs
+    torch.set_num_threads(TORCH_THREADS)
+    
+    # Load the embedding model and run one encode now, so the first request doesn't pay for either
+    embedder = await asyncio.to_thread(get_embedding_model)
+    await asyncio.to_thread(embedder.encode, ["warm up"], show_progress_bar=False)
     
     await init_spider_queue()
     await initialize_playwright_check()  # Add this line
+    await get_zyte_router().start()  # One pooled session for every scrape
 
     yield
 
     # Shutdown: Clean up resources on shutdown
     from app.services.spider_queue import spider_queue
     from app.services.scraping import close_client
+    from app.services.zyte_manager import close_zyte_router
     await spider_queue.stop()
     await close_client()
+    await close_zyte_router()
 
 # Create FastAPI app with the lifespan manager
 app = FastAPI(
@@ -48,6 +70,10 @@ app.add_middleware(
 # Include API routes
 app.include_router(analyze.router, prefix=settings.API_V1_STR)  # First: analysis endpoints
 app.include_router(plagiarism.router, prefix=settings.API_V1_STR)  # Second: plagiarism endpoints
+if settings.scraper.job_webhook_active:
+    app.include_router(zyte.router, prefix=settings.API_V1_STR)  # Scrapy Cloud webhooks
+elif settings.scraper.JOB_WEBHOOK_ENABLED:
+    logging.getLogger(__name__).warning("JOB_WEBHOOK_ENABLED without JOB_WEBHOOK_TOKEN; polling Scrapy Cloud jobs instead")
 # app.include_router(test.router, prefix=settings.API_V1_STR)  # Last: test/debug endpoints
 
 @app.get("/", tags=["health"])
@@ -62,6 +88,7 @@ if __name__ == "__main__":
         "app.main:app", 
         host=settings.API_HOST, 
         port=settings.API_PORT,
-        reload=settings.DEBUG
+        reload=settings.DEBUG,
+        loop="uvloop" if uvloop else "asyncio"
     )
 
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 import os
 
 class TextInput(BaseModel):
@@ -27,6 +27,13 @@ class ResultResponse(BaseModel):
     full_text_with_highlights: str = Field(..., description="Original text with highlighted plagiarized sections")
     themes: List[str] = Field(default_factory=list, description="Detected themes in the text")
 
+class JobFinishedPayload(BaseModel):
+    job: Optional[Union[str, int]] = Field(None, description="Scrapy Cloud job id (project/spider/job)")
+    jobid: Optional[Union[str, int]] = Field(None, description="Job id, older payload format")
+    key: Optional[Union[str, int]] = Field(None, description="Job key, older payload format")
+    state: str = Field("finished", description="Job state")
+    close_reason: str = Field("finished", description="Why the job closed")
+
 # Add enhanced validation models
 
 class ContentValidator:
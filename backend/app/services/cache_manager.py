@@ -24,6 +24,7 @@ class ScrapeCache:
         self.search_cache = diskcache.Cache(f"{cache_dir}/search")
         self.content_cache = diskcache.Cache(f"{cache_dir}/content")
         self.metadata_cache = diskcache.Cache(f"{cache_dir}/metadata")
+        self.validator_cache = diskcache.Cache(f"{cache_dir}/validators")
         
         # TTL values in seconds
         self.ttls = {
@@ -31,36 +32,121 @@ class ScrapeCache:
             "academic": 60 * 60 * 24 * 7,  # 7 days for academic content
             "news": 60 * 60 * 24 * 3,     # 3 days for news
             "standard": 60 * 60 * 24 * 5,  # 5 days for standard sites
-            "metadata": 60 * 60 * 24 * 30  # 30 days for metadata
+            "metadata": 60 * 60 * 24 * 30,  # 30 days for metadata
+            "validators": 60 * 60 * 24 * 30,  # 30 days to revalidate an expired page instead of refetching
+            "failure": 60 * 10,  # 10 minutes before a failed URL is tried again
+            "negative": 60 * 5,  # 5 minutes before a URL that only yielded thin content is tried again
+            "bad_domain": 60 * 60 * 24  # 24 hours before a domain that keeps coming back thin is tried again
+        }
+        
+        # TTLs per classify_website category; stable papers are kept far longer than breaking news
+        self.site_ttls = {
+            "scientific": 60 * 60 * 24 * 7,  # 7 days
+            "news": 60 * 60,  # 1 hour
+            "complex": 60 * 60 * 6,  # 6 hours
+            "standard": 60 * 60 * 24  # 1 day
         }
     
     def _make_key(self, value: str) -> str:
         """Create standardized cache keys"""
         return hashlib.md5(value.encode()).hexdigest()
     
-    def get_content(self, url: str) -> Optional[Dict[str, Any]]:
-        """Get cached content for a URL"""
+    def get_content(self, url: str, max_age_ms: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Get cached content for a URL, optionally only if it was fetched within max_age_ms"""
         key = self._make_key(url)
         result = self.content_cache.get(key)
+        if result and max_age_ms is not None:
+            if (time.time() - result.get("fetched_at", 0)) * 1000 > max_age_ms:
+                return None
         if result:
-            logger.info(f"Cache hit for content: {url}")
+            logger.debug("Cache hit for content: %s", url)
         return result
     
-    def set_content(self, url: str, content: Dict[str, Any]) -> None:
-        """Store content with appropriate TTL based on content type"""
+    def set_content(self, url: str, content: Dict[str, Any], site_type: Optional[str] = None,
+                    ttl: Optional[int] = None) -> None:
+        """
+        Store content with appropriate TTL based on content type
+        
+        An explicit ttl wins, then the TTL for site_type (a classify_website
+        category), then a guess from the domain name.
+        """
         key = self._make_key(url)
-        domain = urlparse(url).netloc.lower()
         
-        # Determine content type for TTL
-        content_type = "standard"
-        if any(a in domain for a in ['sciencedirect', 'springer', 'wiley', 'ncbi']):
-            content_type = "academic"
-        elif any(n in domain for n in ['news', 'times', 'post', 'article']):
-            content_type = "news"
+        if ttl is None and site_type in self.site_ttls:
+            content_type = site_type
+            ttl = self.site_ttls[site_type]
+        else:
+            domain = urlparse(url).netloc.lower()
+            
+            # Determine content type for TTL
+            content_type = "standard"
+            if any(a in domain for a in ['sciencedirect', 'springer', 'wiley', 'ncbi']):
+                content_type = "academic"
+            elif any(n in domain for n in ['news', 'times', 'post', 'article']):
+                content_type = "news"
+            ttl = ttl or self.ttls[content_type]
         
         # Store with appropriate TTL
-        self.content_cache.set(key, content, expire=self.ttls[content_type])
-        logger.info(f"Cached content for {url} as {content_type}")
+        content["fetched_at"] = time.time()
+        self.content_cache.set(key, content, expire=ttl)
+        logger.debug("Cached content for %s as %s", url, content_type)
+    
+    def get_failure(self, url: str) -> Optional[Dict[str, Any]]:
+        """Get the recorded failure for a URL that failed within the failure TTL"""
+        return self.metadata_cache.get(f"failure:{self._make_key(url)}")
+    
+    def set_failure(self, url: str, reason: str, ttl: Optional[int] = None) -> None:
+        """Record a failed scrape so repeat requests skip the URL until the TTL runs out"""
+        self.metadata_cache.set(f"failure:{self._make_key(url)}", {
+            "url": url,
+            "error": reason,
+            "content": "",
+            "fetched_at": time.time()
+        }, expire=ttl or self.ttls["failure"])
+    
+    def is_bad_domain(self, domain: str) -> bool:
+        """Whether the domain was marked bad (captcha, login wall, ...) within the bad-domain TTL"""
+        return f"bad_domain:{domain}" in self.metadata_cache
+    
+    def record_domain_result(self, domain: str, thin: bool, threshold: int) -> bool:
+        """
+        Track consecutive thin scrapes per domain, returning True when the domain was just marked bad
+        
+        A usable scrape resets the count; threshold thin ones in a row mark the
+        domain bad until the bad-domain TTL runs out.
+        """
+        count_key = f"thin_count:{domain}"
+        if not thin:
+            self.metadata_cache.delete(count_key)
+            return False
+        
+        count = self.metadata_cache.get(count_key, 0) + 1
+        if count < threshold:
+            self.metadata_cache.set(count_key, count, expire=self.ttls["bad_domain"])
+            return False
+        
+        self.metadata_cache.delete(count_key)
+        self.metadata_cache.set(f"bad_domain:{domain}", time.time(), expire=self.ttls["bad_domain"])
+        return True
+    
+    def get_validators(self, url: str) -> Optional[Dict[str, Any]]:
+        """Get the ETag/Last-Modified seen for a URL along with the result fetched with them"""
+        return self.validator_cache.get(self._make_key(url))
+    
+    def set_validators(self, url: str, etag: Optional[str], last_modified: Optional[str],
+                       result: Dict[str, Any]) -> None:
+        """Remember a page's validators so it can be revalidated with a conditional request"""
+        self.validator_cache.set(self._make_key(url), {
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+            "result": result
+        }, expire=self.ttls["validators"])
+    
+    def touch_validators(self, url: str, validators: Dict[str, Any]) -> None:
+        """Record that the origin confirmed the stored page is still current (304)"""
+        validators["fetched_at"] = time.time()
+        self.validator_cache.set(self._make_key(url), validators, expire=self.ttls["validators"])
     
     def get_search_results(self, query: str) -> Optional[List[Dict[str, Any]]]:
         """Get cached search results"""
@@ -84,4 +170,5 @@ class ScrapeCache:
         """Clear expired cache entries (maintenance)"""
         self.search_cache.expire()
         self.content_cache.expire()
-        self.metadata_cache.expire()
\ No newline at end of file
+        self.metadata_cache.expire()
+        self.validator_cache.expire()
\ No newline at end of file
@@ -1,14 +1,37 @@
-from typing import List, Dict, Any, Union
+from typing import List
 import numpy as np
 import faiss
+import torch
 from sentence_transformers import SentenceTransformer
 import logging
+import os
 from app.core.config import settings
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Run the embedding model on the GPU when one is available
+if torch.cuda.is_available():
+    DEVICE = "cuda"
+elif getattr(torch.backends, "mps", None) is not None and torch.backends.mps.is_available():
+    DEVICE = "mps"
+else:
+    DEVICE = "cpu"
+
+# Batch size for every model.encode call
+ENCODE_BATCH_SIZE = 64
+
+# FP16 on CUDA is kept only if these embed (almost) identically to FP32
+FP16_CANARY_SENTENCES = [
+    "The quick brown fox jumps over the lazy dog.",
+    "A fast auburn fox leapt over a sleepy hound.",
+]
+FP16_MIN_AGREEMENT = 0.9999
+
+# Pre-quantized INT8 graph shipped in the sentence-transformers model repos (AVX-512 VNNI kernels)
+ONNX_INT8_FILE_NAME = "onnx/model_qint8_avx512_vnni.onnx"
+
 # Global model for embeddings
 _embedding_model = None
 
@@ -17,15 +40,63 @@ def get_embedding_model() -> SentenceTransformer:
     global _embedding_model
     if _embedding_model is None:
         model_name = settings.EMBEDDING_MODEL
-        logger.info(f"Loading embedding model: {model_name}")
-        _embedding_model = SentenceTransformer(model_name)
+        if settings.plagiarism.USE_ONNX_INT8 and DEVICE == "cpu":
+            try:
+                _embedding_model = _load_onnx_int8_model(model_name)
+            except Exception as e:
+                logger.warning(f"INT8 ONNX model unavailable, falling back to PyTorch: {str(e)}")
+        
+        if _embedding_model is None:
+            logger.info(f"Loading embedding model: {model_name} on {DEVICE}")
+            _embedding_model = SentenceTransformer(model_name, device=DEVICE)
+            if DEVICE == "cuda":
+                _embedding_model = _to_half_precision(_embedding_model)
     return _embedding_model
 
+def _to_half_precision(model: SentenceTransformer) -> SentenceTransformer:
+    """Switch a CUDA model to FP16, keeping FP32 if the canary embeddings drift"""
+    fp32 = model.encode(FP16_CANARY_SENTENCES, convert_to_tensor=True, normalize_embeddings=True,
+                        show_progress_bar=False)
+    model.half()
+    fp16 = model.encode(FP16_CANARY_SENTENCES, convert_to_tensor=True, normalize_embeddings=True,
+                        show_progress_bar=False)
+    
+    agreement = torch.nn.functional.cosine_similarity(fp32.float(), fp16.float(), dim=1).min().item()
+    if agreement < FP16_MIN_AGREEMENT:
+        logger.warning(f"FP16 embeddings drifted (cosine {agreement:.6f}), keeping FP32")
+        return model.float()
+    
+    logger.info(f"Embedding model running in FP16 (canary cosine {agreement:.6f})")
+    return model
+
+def _load_onnx_int8_model(model_name: str) -> SentenceTransformer:
+    """Load the dynamically quantized INT8 ONNX export of the model on ONNX Runtime's CPU provider"""
+    import onnxruntime
+    
+    if "CPUExecutionProvider" not in onnxruntime.get_available_providers():
+        raise RuntimeError("ONNX Runtime CPUExecutionProvider not available")
+    
+    session_options = onnxruntime.SessionOptions()
+    session_options.intra_op_num_threads = os.cpu_count() or 1
+    
+    logger.info(f"Loading embedding model: {model_name} as INT8 ONNX ({ONNX_INT8_FILE_NAME})")
+    return SentenceTransformer(
+        model_name,
+        device="cpu",
+        backend="onnx",
+        model_kwargs={
+            "file_name": ONNX_INT8_FILE_NAME,
+            "provider": "CPUExecutionProvider",
+            "session_options": session_options,
+        },
+    )
+
 def get_text_embeddings(texts: List[str]) -> np.ndarray:
-    """Convert text to embeddings"""
+    """Convert text to unit-length embeddings (inner product = cosine similarity)"""
     model = get_embedding_model()
-    embeddings = model.encode(texts, show_progress_bar=False)
-    return embeddings
+    embeddings = model.encode(texts, batch_size=ENCODE_BATCH_SIZE, show_progress_bar=False,
+                              convert_to_numpy=True, normalize_embeddings=True)
+    return embeddings.astype(np.float32, copy=False)  # FP16 models return FP16 arrays
 
 def get_text_embedding(text: str) -> np.ndarray:
     """Convert single text to embedding"""
@@ -36,7 +107,7 @@ def create_faiss_index(embeddings: np.ndarray, index_type: str = "flat") -> fais
     Create a FAISS index for fast similarity search
     
     Args:
-        embeddings: Matrix of embeddings
+        embeddings: Matrix of normalized embeddings (as returned by get_text_embeddings)
         index_type: Type of index ('flat' for exact, 'ivf' for approximate)
     
     Returns:
@@ -58,9 +129,6 @@ def create_faiss_index(embeddings: np.ndarray, index_type: str = "flat") -> fais
     else:
         raise ValueError(f"Unknown index type: {index_type}")
     
-    # Normalize embeddings for cosine similarity
-    faiss.normalize_L2(embeddings)
-    
     # Add vectors to the index
     index.add(embeddings.astype(np.float32))
     return index
@@ -70,19 +138,15 @@ def search_similar_vectors(query_embedding: np.ndarray, index: faiss.Index, k: i
     Search for similar vectors in the index
     
     Args:
-        query_embedding: Query embedding vector
+        query_embedding: Normalized query embedding vector
         index: FAISS index
         k: Number of results to return
     
     Returns:
         Tuple of (distances, indices)
     """
-    # Normalize query for cosine similarity
-    query_embedding_normalized = query_embedding.copy().astype(np.float32)
-    faiss.normalize_L2(query_embedding_normalized.reshape(1, -1))
-    
     # Search the index
-    distances, indices = index.search(query_embedding_normalized.reshape(1, -1), k)
+    distances, indices = index.search(query_embedding.astype(np.float32).reshape(1, -1), k)
     return distances[0], indices[0]
 
 async def get_text_themes(text: str, max_themes: int = 5) -> List[str]:
@@ -130,5 +194,5 @@ async def get_text_themes(text: str, max_themes: int = 5) -> List[str]:
         return common_themes[:max_themes]
     
     except Exception as e:
-        print(f"Error extracting themes: {str(e)}")
+        logger.warning(f"Error extracting themes: {str(e)}")
         return ["general"]  # Fallback theme
\ No newline at end of file
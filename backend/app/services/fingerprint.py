@@ -0,0 +1,42 @@
+# backend/app/services/fingerprint.py
+import re
+import numpy as np
+import xxhash
+
+# Word n-gram size used for shingling
+SHINGLE_SIZE = 5
+
+_WORD_RE = re.compile(r'\w+')
+
+def simhash64(text: str) -> int:
+    """
+    Compute a 64-bit SimHash fingerprint of text
+
+    Word 5-gram shingles are hashed with xxhash64 and their bits accumulated
+    as +1/-1 votes; each fingerprint bit is the sign of its vote total.
+    Near-duplicate documents end up a small Hamming distance apart.
+    """
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return 0
+
+    if len(words) <= SHINGLE_SIZE:
+        shingles = [' '.join(words)]
+    else:
+        shingles = [' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+
+    hashes = np.fromiter((xxhash.xxh64_intdigest(s) for s in shingles),
+                         dtype=np.uint64, count=len(shingles))
+
+    # Unpack every hash into its 64 bits and count the set bits per position
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1)
+    votes = 2 * bits.sum(axis=0, dtype=np.int64) - len(shingles)
+
+    fingerprint = 0
+    for position in np.nonzero(votes > 0)[0]:
+        fingerprint |= 1 << int(position)
+    return fingerprint
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two fingerprints"""
+    return (a ^ b).bit_count()
@@ -0,0 +1,122 @@
+# backend/app/services/html_extract.py
+# lxml main-content extraction, run in the scraper's parse process pool.
+# Imports nothing from the app, so spawned parse workers only load lxml.
+import re
+from functools import lru_cache
+from typing import Dict, Tuple, Union
+
+from lxml import etree, html as lxml_html
+
+# Content selectors in precedence order, built once instead of per call
+MAIN_SELECTORS = ('article', 'main', '.post-content', '.entry-content',
+                  '#content', '.content', '.article', '.post',
+                  '#main-content', '.page-content', '.wiki-body-section',
+                  '#mw-content-text', '.mw-parser-output')
+ZYTE_MAIN_SELECTORS = MAIN_SELECTORS[:8]
+
+# Tags stripped from the whole tree before looking for content; the HTTP scraper also drops the classes
+_NOISE_TAGS = ('script', 'style', 'noscript', 'svg', 'iframe', 'nav', 'header', 'footer', 'aside')
+NOISE_CLASSES = frozenset(('nav', 'footer', 'comment', 'sidebar'))
+
+WHITESPACE_RE = re.compile(r'\s+')
+# lxml refuses str input that carries an encoding declaration
+_XML_DECL_RE = re.compile(r'^\s*<\?xml[^>]*\?>')
+# Substantial <p>s for the paragraph fallback, and the whitespace-normalized text of an element
+_LONG_PARAGRAPHS_XPATH = etree.XPath('//p[string-length(normalize-space(.)) > $min_length]')
+_NORMALIZED_TEXT_XPATH = etree.XPath('normalize-space(.)')
+
+def _selector_ranks(selectors) -> Tuple[Dict[str, int], Dict[str, int], Dict[str, int]]:
+    """Split simple tag/.class/#id selectors into name -> precedence lookups"""
+    tags, classes, ids = {}, {}, {}
+    for rank, selector in enumerate(selectors):
+        if selector.startswith('.'):
+            classes.setdefault(selector[1:], rank)
+        elif selector.startswith('#'):
+            ids.setdefault(selector[1:], rank)
+        else:
+            tags.setdefault(selector, rank)
+    return tags, classes, ids
+
+_MAIN_TAG_RANKS, _MAIN_CLASS_RANKS, _MAIN_ID_RANKS = _selector_ranks(MAIN_SELECTORS)
+
+@lru_cache(maxsize=16)
+def _html_parser(encoding: str) -> lxml_html.HTMLParser:
+    """Reusable lxml parser that decodes raw bytes with a known encoding"""
+    try:
+        return lxml_html.HTMLParser(encoding=encoding)
+    except LookupError:
+        return lxml_html.HTMLParser(encoding='utf-8')
+
+def _element_text(element, separator: str = ' ') -> str:
+    """Stripped text fragments of an element joined by separator, like BS4's get_text(separator, strip=True)"""
+    return separator.join(text for text in map(str.strip, element.itertext()) if text)
+
+def _best_main_content(tree, max_rank: int = len(MAIN_SELECTORS), min_length: int = 200) -> str:
+    """
+    Text of the highest-precedence MAIN_SELECTORS match with substantial content
+
+    Walks the tree once, bucketing each element by the best selector it
+    matches, instead of running one CSS query per selector. Only the first
+    max_rank selectors are considered.
+    """
+    candidates = [[] for _ in range(max_rank)]
+    for element in tree.iter(etree.Element):
+        rank = _MAIN_TAG_RANKS.get(element.tag, max_rank)
+        for cls in (element.get('class') or '').split():
+            rank = min(rank, _MAIN_CLASS_RANKS.get(cls, rank))
+        element_id = element.get('id')
+        if element_id:
+            rank = min(rank, _MAIN_ID_RANKS.get(element_id, rank))
+        if rank < max_rank:
+            candidates[rank].append(element)
+    
+    for bucket in candidates:
+        for element in bucket:
+            element_text = _element_text(element)
+            if len(element_text) >= min_length:  # Only use substantial content
+                return element_text
+    return ""
+
+def extract_main_content(html: Union[str, bytes], max_rank: int = len(MAIN_SELECTORS),
+                         noise_classes: frozenset = frozenset(), encoding: str = 'utf-8') -> Tuple[str, str]:
+    """
+    Parse a page with lxml and pull out its (title, main content)
+
+    Text comes from lxml's C-level tree iteration rather than BS4's
+    NavigableString wrappers. Raw bytes are parsed directly using encoding.
+    Pure and picklable, so the router runs it in its parse process pool.
+    """
+    if isinstance(html, str):
+        html = _XML_DECL_RE.sub('', html, count=1)
+    if not html.strip():
+        return "", ""
+    parser = _html_parser(encoding) if isinstance(html, bytes) else None
+    try:
+        tree = lxml_html.document_fromstring(html, parser=parser)
+    except etree.ParserError:
+        # Only comments or empty markup ("Document is empty"): no text, not a scrape error
+        return "", ""
+    title = tree.findtext('.//title') or ""
+    
+    # Strip unwanted elements once for the whole tree, keeping the text that follows them
+    etree.strip_elements(tree, etree.Comment, *_NOISE_TAGS, with_tail=False)
+    if noise_classes:
+        for element in list(tree.iter(etree.Element)):
+            classes = element.get('class')
+            if classes and element.getparent() is not None and not noise_classes.isdisjoint(classes.split()):
+                element.drop_tree()
+    
+    content = _best_main_content(tree, max_rank)
+    
+    # Fallback to paragraphs if no content found; filtering and text normalization both run in libxml2
+    if not content:
+        paragraphs = [_NORMALIZED_TEXT_XPATH(p) for p in _LONG_PARAGRAPHS_XPATH(tree, min_length=40)]
+        if paragraphs:
+            content = ' '.join(paragraphs)
+    
+    # Last resort - get all text from body
+    if not content or len(content) < 200:
+        body = tree.find('body')
+        content = _element_text(body if body is not None else tree)
+    
+    return title, WHITESPACE_RE.sub(' ', content).strip()
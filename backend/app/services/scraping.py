@@ -157,31 +157,17 @@ def classify_website(url: str) -> str:
     Classifies websites to determine the best scraping approach without hardcoding domains.
     Returns: 'scientific', 'news', 'standard', or 'complex'
     """
-    from app.services.zyte_manager import ZyteServiceRouter
-    router = ZyteServiceRouter(
-        api_key=settings.ZYTE_API_KEY,
-        project_id=settings.ZYTE_PROJECT_ID
-    )
-    return router.classify_website(url)
+    from app.services.zyte_manager import get_zyte_router
+    return get_zyte_router().classify_website(url)
 
 # ----- Scraping Functions - Now Use ZyteServiceRouter -----
 
 async def smart_scrape_content(url: str) -> Dict[str, Any]:
     """Smart scraping using ZyteServiceRouter"""
-    from app.services.zyte_manager import ZyteServiceRouter
-    
-    # Create router instance
-    router = ZyteServiceRouter(
-        api_key=settings.ZYTE_API_KEY,
-        project_id=settings.ZYTE_PROJECT_ID
-    )
+    from app.services.zyte_manager import get_zyte_router
     
-    try:
-        # Use the optimal service selection
-        return await router.scrape_with_optimal_service(url)
-    finally:
-        # Ensure resources are cleaned up
-        await router.close()
+    # Use the optimal service selection, bounded by the global scrape limit
+    return await get_zyte_router().scrape_with_retry(url)
 
 async def scrape_content(url: str) -> str:
     """Scrape content with optimized settings - returns just the content text"""
@@ -190,23 +176,13 @@ async def scrape_content(url: str) -> str:
 
 async def scrape_multiple_content(urls: List[str], max_concurrent: int = 3) -> List[Dict[str, Any]]:
     """Scrape multiple URLs concurrently using ZyteServiceRouter"""
-    from app.services.zyte_manager import ZyteServiceRouter
+    from app.services.zyte_manager import get_zyte_router
     
-    # Create router instance
-    router = ZyteServiceRouter(
-        api_key=settings.ZYTE_API_KEY,
-        project_id=settings.ZYTE_PROJECT_ID
+    # Use the router's parallel scraping capability
+    return await get_zyte_router().scrape_urls_in_parallel(
+        urls=urls,
+        max_concurrent=max_concurrent
     )
-    
-    try:
-        # Use the router's parallel scraping capability
-        return await router.scrape_urls_in_parallel(
-            urls=urls,
-            max_concurrent=max_concurrent
-        )
-    finally:
-        # Ensure resources are cleaned up
-        await router.close()
 
 # Add this function after the other scraping functions section
 async def direct_scrape_url(url: str) -> Dict[str, Any]:
@@ -216,79 +192,58 @@ async def direct_scrape_url(url: str) -> Dict[str, Any]:
     Note: Consider updating code that calls this function to use ZyteServiceRouter directly.
     """
     logger.warning("direct_scrape_url is deprecated - use ZyteServiceRouter instead")
-    from app.services.zyte_manager import ZyteServiceRouter
-    
-    router = ZyteServiceRouter(
-        api_key=settings.ZYTE_API_KEY,
-        project_id=settings.ZYTE_PROJECT_ID
-    )
+    from app.services.zyte_manager import get_zyte_router
     
-    try:
-        return await router.scrape_with_http(url)
-    finally:
-        await router.close()
+    return await get_zyte_router().scrape_with_http(url)
 
 # ----- Search Functions -----
 
 async def search_relevant_content(query: str, max_results: int = 10) -> List[Dict[str, str]]:
     """Search for content relevant to the query"""
-    from app.services.zyte_manager import ZyteServiceRouter
+    # For now, use the legacy search implementation from ZyteClient
+    client = get_zyte_client()
     
-    router = ZyteServiceRouter(
-        api_key=settings.ZYTE_API_KEY,
-        project_id=settings.ZYTE_PROJECT_ID
-    )
+    # Optimize query for plagiarism detection
+    optimized_query = f"{query}"
     
-    try:
-        # First check if we've implemented a search method in ZyteServiceRouter
-        # If not, fall back to legacy implementation
-        
-        # For now, use the legacy search implementation from ZyteClient
-        client = get_zyte_client()
-        
-        # Optimize query for plagiarism detection
-        optimized_query = f"{query}"
-        
-        # Search using client's advanced search method
-        results = await client.search_web(optimized_query, max_results * 2)
+    # Search using client's advanced search method
+    results = await client.search_web(optimized_query, max_results * 2)
+    
+    # Advanced filtering for plagiarism-relevant sources
+    filtered_results = []
+    for result in results:
+        url = result["url"]
+        domain = urlparse(url).netloc
         
-        # Advanced filtering for plagiarism-relevant sources
-        filtered_results = []
-        for result in results:
-            url = result["url"]
-            domain = urlparse(url).netloc
+        # Skip obvious non-content pages
+        if re.search(r'/(login|signup|register|cart|checkout|account|profile|contact|about)/?$', url, re.I):
+            continue
             
-            # Skip obvious non-content pages
-            if re.search(r'/(login|signup|register|cart|checkout|account|profile|contact|about)/?$', url, re.I):
-                continue
-                
-            # Skip PDFs, office docs, etc.
-            if re.search(r'\.(pdf|doc|docx|ppt|pptx)$', url, re.I):
-                continue
-                
-            # Skip social media
-            if any(site in domain for site in ['facebook.com', 'twitter.com', 'instagram.com', 'tiktok.com', 'youtube.com']):
-                continue
-                
-            filtered_results.append(result)
+        # Skip PDFs, office docs, etc.
+        if re.search(r'\.(pdf|doc|docx|ppt|pptx)$', url, re.I):
+            continue
             
-            # Stop once we have enough results
-            if len(filtered_results) >= max_results:
-                break
-        
-        # Sort results by relevance to plagiarism (academic & educational sources first)
-        filtered_results.sort(key=lambda x: (
-            # Educational/academic sources get highest priority
-            2 if x.get('content_type') == 'academic' or '.edu' in urlparse(x['url']).netloc else
-            # Wikipedia and other reference sources next
-            1 if x.get('content_type') == 'encyclopedia' else
-            # Everything else
-            0
-        ), reverse=True)
+        # Skip social media
+        if any(site in domain for site in ['facebook.com', 'twitter.com', 'instagram.com', 'tiktok.com', 'youtube.com']):
+            continue
+            
+        filtered_results.append(result)
         
-        return filtered_results[:max_results]
-    finally:
-        await router.close()
+        # Stop once we have enough results
+        if len(filtered_results) >= max_results:
+            break
+    
+    # Sort results by relevance to plagiarism (academic & educational sources first)
+    filtered_results.sort(key=lambda x: (
+        # Educational/academic sources get highest priority
+        2 if x.get('content_type') == 'academic' or '.edu' in urlparse(x['url']).netloc else
+        # Wikipedia and other reference sources next
+        1 if x.get('content_type') == 'encyclopedia' else
+        # Everything else
+        0
+    ), reverse=True)
+    
+    return filtered_results[:max_results]
 
 async def find_and_scrape_sources(text: str, max_sources: int = 5) -> List[Dict[str, Any]]:
     """Find and scrape potential plagiarism sources"""
@@ -297,7 +252,7 @@ async def find_and_scrape_sources(text: str, max_sources: int = 5) -> List[Dict[
 
 async def find_and_scrape_sources_optimized(text: str, max_sources: int = 5) -> List[Dict[str, Any]]:
     """Find and scrape potential plagiarism sources using the service router"""
-    from app.services.zyte_manager import ZyteServiceRouter
+    from app.services.zyte_manager import get_zyte_router
     
     # 1. Extract search phrases - use multiple phrases to increase chances of finding matches
     search_phrases = extract_search_phrases(text, num_phrases=2)
@@ -339,40 +294,33 @@ async def find_and_scrape_sources_optimized(text: str, max_sources: int = 5) ->
     # Log the URLs we'll be scraping
     logger.info(f"Found {len(urls_to_scrape)} URLs to scrape for potential matches")
     
-    # 3. Initialize the service router
-    router = ZyteServiceRouter(
-        api_key=settings.ZYTE_API_KEY,
-        project_id=settings.ZYTE_PROJECT_ID
-    )
-    
-    try:
-        # 4. Scrape URLs in parallel - limit to avoid rate limits and timeouts
-        max_urls_to_scrape = min(max_sources * 3, len(urls_to_scrape))
-        results = await router.scrape_urls_in_parallel(
-            urls=urls_to_scrape[:max_urls_to_scrape],
-            max_concurrent=2  # Lower concurrency for more reliability
-        )
-        
-        # 5. Filter and format results
-        sources = []
-        for result in results:
-            if result and result.get("content") and len(result.get("content", "")) > 200:
-                # Calculate relevance to the original text
-                relevance = calculate_content_relevance(text, result.get("content", ""))
-                
-                sources.append({
-                    "url": result["url"],
-                    "content": result["content"],
-                    "title": result.get("title", ""),
-                    "relevance": relevance
-                })
+    # 3. Use the shared service router
+    router = get_zyte_router()
+    
+    # 4. Scrape URLs in parallel - limit to avoid rate limits and timeouts
+    max_urls_to_scrape = min(max_sources * 3, len(urls_to_scrape))
+    
+    # 5. Score and format results as each scrape finishes
+    sources = []
+    async for result in router.iter_scrape_urls(
+        urls=urls_to_scrape[:max_urls_to_scrape],
+        max_concurrent=2  # Lower concurrency for more reliability
+    ):
+        # iter_scrape_urls only yields results with usable content
+        # Calculate relevance to the original text
+        relevance = calculate_content_relevance(text, result["content"])
         
-        # 6. Sort by relevance and return top results
-        sources.sort(key=lambda x: x.get("relevance", 0), reverse=True)
-        return sources[:max_sources]
-    finally:
-        # Ensure router is closed
-        await router.close()
+        sources.append({
+            "url": result["url"],
+            "content": result["content"],
+            "title": result.get("title", ""),
+            "relevance": relevance,
+            "simhash": result.get("simhash")
+        })
+    
+    # 6. Sort by relevance and return top results
+    sources.sort(key=lambda x: x.get("relevance", 0), reverse=True)
+    return sources[:max_sources]
 
 # ----- Legacy ZyteClient for Backward Compatibility -----
 
@@ -1,29 +1,41 @@
-from typing import List, Dict, Any, Set, Tuple
+from typing import List, Dict, Any, Optional, Set, Tuple
 import numpy as np
 # import faiss
 import re
 import asyncio
+import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 import numpy as np
+import torch
+import diskcache
+import xxhash
 
-from app.services.embedding import get_text_embedding, get_text_embeddings, create_faiss_index, search_similar_vectors
-from sentence_transformers import SentenceTransformer, util
+from app.services.embedding import create_faiss_index, get_embedding_model, ENCODE_BATCH_SIZE
+from app.services.fingerprint import simhash64, hamming_distance
 import nltk
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
 
-# cache a single model load
-_model = SentenceTransformer("all-MiniLM-L6-v2")
+# cache a single model load - the same (possibly INT8 ONNX) instance the embedding service uses
+_model = get_embedding_model()
 
 # Comprehensive NLTK data download
 try:
-    nltk.download('punkt')
+    nltk.download('punkt', quiet=True)
     try:
-        nltk.download('punkt_tab')
+        nltk.download('punkt_tab', quiet=True)
     except:
-        print("Note: punkt_tab not available in standard NLTK repository, using punkt instead")
+        logger.info("punkt_tab not available in standard NLTK repository, using punkt instead")
 except Exception as e:
-    print(f"Warning: NLTK download failed: {str(e)}")
+    logger.warning(f"NLTK download failed: {str(e)}")
+
+# Set once the NLTK tokenizer fallback has been reported, so it logs once instead of per call
+_warned = False
 
 # Constants for plagiarism detection
 CHUNK_SIZE = 20
@@ -35,23 +47,388 @@ MIN_SENTENCE_LENGTH = settings.plagiarism.SENTENCE_MIN_LENGTH
 MAX_SENTENCES = settings.plagiarism.MAX_SENTENCES_PER_SOURCE
 MAX_CHUNKS = 150
 
-# Global model for sentence-level comparisons
-sentence_model = None
+# Per-content cache of (sentences, FP16 embeddings) so a source is only encoded once
+SOURCE_VECTOR_TTL = 60 * 60 * 24 * 7  # 7 days
+_source_vector_cache = diskcache.Cache(f"{getattr(settings, 'CACHE_DIR', './cache')}/embeddings")
+
+# In-process LRU in front of the disk cache, so hot sources skip unpickling too
+SOURCE_VECTOR_LRU_SIZE = 512
+_source_vector_lru: "OrderedDict[int, Tuple[List[str], np.ndarray]]" = OrderedDict()
+
+# Sources being encoded right now, by content hash, so concurrent requests for the same page encode it once
+_source_vector_in_flight: Dict[int, asyncio.Future] = {}
+
+# Nearest source sentences considered per text sentence, so one that fails its source's
+# threshold or verification can still match another source
+SOURCE_CANDIDATES_K = 4
+
+# Thread pool for encoding and scoring - encode/matmul release the GIL inside torch/BLAS.
+# The app's lifespan gives each worker's torch ops an equal share of the cores (TORCH_THREADS)
+# so concurrent encodes don't oversubscribe them.
+SCORING_WORKERS = min(4, os.cpu_count() or 1)
+TORCH_THREADS = max(1, (os.cpu_count() or 1) // SCORING_WORKERS)
+_SCORING_EXECUTOR = ThreadPoolExecutor(max_workers=SCORING_WORKERS)
+
+# MinHash LSH pre-filter (settings.plagiarism.USE_LSH_PREFILTER): estimated shingle Jaccard needed to keep a pair
+LSH_THRESHOLD = 0.3
+LSH_NUM_PERM = 64
+
+# Micro-batching of encode calls across concurrent requests
+ENCODE_BATCH_WINDOW_S = 0.005
+_encode_pending: List[Tuple[asyncio.Future, List[str]]] = []
+_encode_wakeup = asyncio.Event()
+_encode_batcher_task = None
+_encode_batch_tasks: Set[asyncio.Task] = set()
+
+# Normalization patterns, compiled once
+_WS_RE = re.compile(r'\s+')
+_PUNCT_RE = re.compile(r'[^\w\s]')
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9]')
+
+# Deletes every ASCII character outside [a-z0-9] in one C-level str.translate pass (input is lowercased first)
+_ASCII_NON_ALNUM = str.maketrans('', '', ''.join(
+    chr(c) for c in range(128) if not ('a' <= chr(c) <= 'z' or '0' <= chr(c) <= '9')
+))
+
+# Sentence boundary: terminal punctuation, whitespace, then something that can start a sentence
+_SENT_SPLIT_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"\'])')
+
+# Texts at least this long that the regex leaves in one piece are handed to NLTK instead
+REGEX_SPLIT_MIN_LENGTH = 300
+
+# Span merge used by highlighting, JIT-compiled with numba on first use if available
+_merge_spans_impl = None
+
+# Above this length, substring checks hash the long side's windows instead of rescanning it per probe
+LONG_SUBSTRING_HAYSTACK = 2000
 
 def get_sentence_model():
-    """Get or initialize sentence transformer model""" 
-    global sentence_model
-    if sentence_model is None:
-        sentence_model = SentenceTransformer(settings.EMBEDDING_MODEL)
-    return sentence_model
+    """Get or initialize sentence transformer model - shared with the embedding service""" 
+    return get_embedding_model()
+
+def _encode_sentences(sentences: List[str]) -> np.ndarray:
+    """Encode sentences to normalized embeddings in a single batched forward pass"""
+    # sentence-transformers sorts the batch by length internally (and restores the order),
+    # so mixing short and long sentences from different sources doesn't inflate padding
+    embeddings = get_sentence_model().encode(sentences, batch_size=ENCODE_BATCH_SIZE, show_progress_bar=False,
+                                             convert_to_numpy=True, normalize_embeddings=True)
+    return embeddings.astype(np.float32, copy=False)  # FP16 models return FP16 arrays
+
+def _source_sentences(content: str) -> List[str]:
+    """Split source content into the sentences that get embedded and compared"""
+    sentences = split_into_sentences(content)
+    sentences = [s for s in sentences if len(s) >= MIN_SENTENCE_LENGTH]
+    return sentences[:MAX_SENTENCES]
+
+def _get_cached_source_vectors(key: int):
+    """Look up a source's (sentences, embeddings) in the in-process LRU, then on disk"""
+    cached = _source_vector_lru.get(key)
+    if cached is not None:
+        _source_vector_lru.move_to_end(key)
+        return cached
+    
+    cached = _source_vector_cache.get(key)
+    if cached is not None:
+        _remember_source_vectors(key, cached)
+    return cached
+
+def _remember_source_vectors(key: int, vectors: Tuple[List[str], np.ndarray]):
+    """Add a source's vectors to the in-process LRU, evicting the least recently used"""
+    _source_vector_lru[key] = vectors
+    _source_vector_lru.move_to_end(key)
+    if len(_source_vector_lru) > SOURCE_VECTOR_LRU_SIZE:
+        _source_vector_lru.popitem(last=False)
+
+async def _encode_async(sentences: List[str]) -> np.ndarray:
+    """
+    Encode sentences through the shared micro-batcher, off the event loop
+    
+    Calls made by concurrent requests within ENCODE_BATCH_WINDOW_S of each other
+    are merged into a single model.encode forward pass.
+    """
+    global _encode_batcher_task
+    if not sentences:
+        return np.empty((0, EMBEDDING_DIMENSION), dtype=np.float32)
+    
+    loop = asyncio.get_running_loop()
+    if _encode_batcher_task is None or _encode_batcher_task.done():
+        _encode_batcher_task = loop.create_task(_encode_batcher())
+    
+    future = loop.create_future()
+    _encode_pending.append((future, sentences))
+    _encode_wakeup.set()
+    return await future
+
+async def _encode_batcher():
+    """
+    Background task: collect pending encode calls into batches and dispatch each one
+    
+    Up to SCORING_WORKERS batches encode at once (torch threads are sized for that);
+    while all are busy, new calls keep piling up into the next, larger batch.
+    """
+    workers = asyncio.Semaphore(SCORING_WORKERS)
+    while True:
+        await _encode_wakeup.wait()
+        
+        # Give other requests a moment to join, unless there's already a full batch
+        if sum(len(sentences) for _, sentences in _encode_pending) < ENCODE_BATCH_SIZE:
+            await asyncio.sleep(ENCODE_BATCH_WINDOW_S)
+        
+        await workers.acquire()
+        pending = list(_encode_pending)
+        _encode_pending.clear()
+        _encode_wakeup.clear()
+        
+        task = asyncio.create_task(_run_encode_batch(pending, workers))
+        _encode_batch_tasks.add(task)
+        task.add_done_callback(_encode_batch_tasks.discard)
+
+async def _run_encode_batch(pending: List[Tuple[asyncio.Future, List[str]]], workers: asyncio.Semaphore):
+    """Encode one drained batch in the scoring pool and hand each caller its slice"""
+    loop = asyncio.get_running_loop()
+    batch = [sentence for _, sentences in pending for sentence in sentences]
+    try:
+        embeddings = await loop.run_in_executor(_SCORING_EXECUTOR, _encode_sentences, batch)
+    except Exception as e:
+        logger.error(f"Batched encode of {len(batch)} sentences failed: {str(e)}")
+        for future, _ in pending:
+            if not future.done():
+                future.set_exception(e)
+        return
+    finally:
+        workers.release()
+    
+    start = 0
+    for future, sentences in pending:
+        if not future.done():
+            future.set_result(embeddings[start:start + len(sentences)])
+        start += len(sentences)
+
+async def get_text_and_source_vectors(
+    text_sentences: List[str], sources: List[Tuple[str, str]]
+) -> Tuple[np.ndarray, List[Tuple[List[str], np.ndarray]]]:
+    """
+    Embed the text sentences and every uncached source in one model.encode call
+    
+    Returns the text embeddings and, per (url, content) source, its sentences and FP16
+    embeddings. Sources are cached by a 64-bit hash of their content, so the same page
+    scraped for different requests (or under different URLs) is split and encoded once;
+    a page another request is already encoding is awaited rather than encoded again.
+    """
+    keys = [xxhash.xxh64_intdigest(content) for _, content in sources]
+    source_vectors = [_get_cached_source_vectors(key) for key in keys]
+    
+    if all(cached is not None for cached in source_vectors):
+        return await _encode_async(text_sentences), source_vectors
+    
+    # With the LSH pre-filter what's encoded depends on this text, so it's neither shared nor cached
+    shared = not settings.plagiarism.USE_LSH_PREFILTER
+    loop = asyncio.get_running_loop()
+    contents = {key: content for key, (_, content) in zip(keys, sources)}
+    claimed: Dict[int, asyncio.Future] = {}
+    awaited: Dict[int, asyncio.Future] = {}
+    for key, cached in zip(keys, source_vectors):
+        if cached is not None or key in claimed or key in awaited:
+            continue
+        in_flight = _source_vector_in_flight.get(key) if shared else None
+        if in_flight is not None:
+            awaited[key] = in_flight
+        else:
+            claimed[key] = loop.create_future()
+            if shared:
+                _source_vector_in_flight[key] = claimed[key]
+    
+    resolved: Dict[int, Tuple[List[str], np.ndarray]] = {}
+    try:
+        # Splitting multi-MB pages and MinHashing every shingle is CPU work; keep it off the event loop
+        missing_sentences, pruned = await loop.run_in_executor(
+            _SCORING_EXECUTOR, _split_claimed_sources, text_sentences, [contents[key] for key in claimed]
+        )
+        
+        # One batch: text sentences first, then every claimed source's sentences in order
+        batch = list(text_sentences)
+        for sentences in missing_sentences:
+            batch.extend(sentences)
+        embeddings = await _encode_async(batch)
+    except BaseException as e:
+        # Waiters on our claims fall back to encoding the source themselves
+        for key, future in claimed.items():
+            _release_source_claim(key, future, e)
+        raise
+    
+    text_embeddings = embeddings[:len(text_sentences)]
+    offsets = np.cumsum([len(sentences) for sentences in missing_sentences])[:-1]
+    for (key, future), sentences, source_embeddings in zip(claimed.items(), missing_sentences,
+                                                           np.split(embeddings[len(text_sentences):], offsets)):
+        resolved[key] = (sentences, source_embeddings.astype(np.float16))
+        if not pruned:
+            _remember_source_vectors(key, resolved[key])
+            _source_vector_cache.set(key, resolved[key], expire=SOURCE_VECTOR_TTL)
+        future.set_result(resolved[key])
+        _release_source_claim(key, future)
+    
+    for key, future in awaited.items():
+        try:
+            resolved[key] = await asyncio.shield(future)
+        except Exception:
+            # The request encoding it failed or went away; encode it here instead
+            sentences = await loop.run_in_executor(_SCORING_EXECUTOR, _source_sentences, contents[key])
+            resolved[key] = (sentences, (await _encode_async(sentences)).astype(np.float16))
+    
+    source_vectors = [cached if cached is not None else resolved[key] for key, cached in zip(keys, source_vectors)]
+    return text_embeddings, source_vectors
+
+def _split_claimed_sources(text_sentences: List[str], contents: List[str]) -> Tuple[List[List[str]], bool]:
+    """
+    Sentences to encode for each source, and whether they were LSH-pruned against the text
+    
+    Runs in the scoring pool. With the pre-filter on, source sentences that share no
+    shingles with the text are skipped.
+    """
+    missing_sentences = [_source_sentences(content) for content in contents]
+    lsh = build_sentence_lsh(text_sentences) if settings.plagiarism.USE_LSH_PREFILTER else None
+    if lsh is None:
+        return missing_sentences, False
+    return [lsh_filter(lsh, sentences) for sentences in missing_sentences], True
+
+def _release_source_claim(key: int, future: asyncio.Future, error: BaseException = None):
+    """Drop a source's in-flight claim, failing its future if the encode didn't finish"""
+    if _source_vector_in_flight.get(key) is future:
+        del _source_vector_in_flight[key]
+    if error is not None and not future.done():
+        future.set_exception(RuntimeError(f"Source encode failed: {error!r}"))
+        future.exception()  # Retrieved here, so it isn't reported when nobody was waiting
+
+def _sentence_shingles(sentence: str) -> Set[str]:
+    """Word 3-shingles of a sentence (the whole sentence if it's shorter)"""
+    words = normalize_text(sentence).split()
+    if len(words) < 3:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + 3]) for i in range(len(words) - 2)}
+
+def _sentence_minhash(shingles: Set[str]):
+    """MinHash sketch of a shingle set"""
+    from datasketch import MinHash
+    minhash = MinHash(num_perm=LSH_NUM_PERM)
+    minhash.update_batch([shingle.encode() for shingle in shingles])
+    return minhash
+
+def build_sentence_lsh(text_sentences: List[str]):
+    """MinHash LSH index over the text's sentences, or None if datasketch isn't installed"""
+    try:
+        from datasketch import MinHashLSH
+    except ImportError:
+        return None
+    
+    lsh = MinHashLSH(threshold=LSH_THRESHOLD, num_perm=LSH_NUM_PERM)
+    for i, sentence in enumerate(text_sentences):
+        shingles = _sentence_shingles(sentence)
+        if shingles:
+            lsh.insert(i, _sentence_minhash(shingles))
+    return lsh
+
+def lsh_filter(lsh, sentences: List[str]) -> List[str]:
+    """Keep the sentences that the LSH index pairs with at least one text sentence"""
+    kept = []
+    for sentence in sentences:
+        shingles = _sentence_shingles(sentence)
+        if shingles and lsh.query(_sentence_minhash(shingles)):
+            kept.append(sentence)
+    return kept
 
 def normalize_text(text: str) -> str:
     """Normalize text for more accurate comparison"""
     text = text.lower()
-    text = re.sub(r'\s+', ' ', text)  # Normalize whitespace
-    text = re.sub(r'[^\w\s]', '', text)  # Remove punctuation
+    text = _WS_RE.sub(' ', text)  # Normalize whitespace
+    text = _PUNCT_RE.sub('', text)  # Remove punctuation
     return text.strip()
 
+# CRITICAL FIX 1: Better normalization for full text comparison
+def deep_normalize(content: str, _skip_lower: bool = False) -> str:
+    """Deeply normalize text for robust matching using configurable settings (_skip_lower: already lowercased)"""
+    if not content:
+        return ""
+    
+    # Apply normalization based on config
+    plagiarism = settings.plagiarism
+    if plagiarism.NORMALIZE_CASE and not _skip_lower:
+        content = content.lower()
+
+    if plagiarism.NORMALIZE_WHITESPACE:
+        content = _WS_RE.sub(' ', content)  # Normalize all whitespace
+
+    if plagiarism.NORMALIZE_PUNCTUATION:
+        content = _PUNCT_RE.sub('', content)  # Remove punctuation
+
+    return content.strip()
+
+# Extra robust normalization (handles more edge cases)
+def extra_normalize(content: str, _skip_lower: bool = False) -> str:
+    """Even more aggressive normalization for truly difficult cases (_skip_lower: already lowercased)"""
+    if not content:
+        return ""
+    if not _skip_lower:
+        content = content.lower()
+    # Remove ALL non-alphanumeric characters (including spaces)
+    if content.isascii():
+        return content.translate(_ASCII_NON_ALNUM)
+    return _NON_ALNUM_RE.sub('', content)
+
+def normalize_both(content: str) -> Tuple[str, str]:
+    """Deep- and extra-normalized forms of content, lowercasing it only once"""
+    lowered = content.lower()
+    deep = deep_normalize(lowered if settings.plagiarism.NORMALIZE_CASE else content, _skip_lower=True)
+    return deep, extra_normalize(lowered, _skip_lower=True)
+
+# Keyed by and holding whole page texts, so only the few sources of the current requests are kept
+@lru_cache(maxsize=16)
+def normalize_source(content: str) -> Tuple[str, str]:
+    """Deep- and extra-normalized forms of a source's content, memoized across requests"""
+    return normalize_both(content)
+
+def build_paragraph_automaton(paragraph_norms: List[str]):
+    """Aho-Corasick automaton over normalized paragraphs, or None if pyahocorasick isn't installed"""
+    if not paragraph_norms:
+        return None
+    try:
+        import ahocorasick
+    except ImportError:
+        return None
+    
+    # Value is (distinct paragraph id, occurrences in the text) so repeated paragraphs still count
+    automaton = ahocorasick.Automaton()
+    for para_id, para_norm in enumerate(dict.fromkeys(paragraph_norms)):
+        automaton.add_word(para_norm, (para_id, paragraph_norms.count(para_norm)))
+    automaton.make_automaton()
+    return automaton
+
+def count_matching_paragraphs(paragraph_norms: List[str], automaton, normalized_source: str,
+                              stop_at: int = None) -> int:
+    """Count the text's paragraphs that occur verbatim in the normalized source, stopping once stop_at is reached"""
+    if stop_at is None:
+        stop_at = len(paragraph_norms)
+    matches = 0
+    
+    if automaton is not None:
+        # One pass over the source finds every paragraph it contains
+        found = set()
+        for _, (para_id, occurrences) in automaton.iter(normalized_source):
+            if para_id not in found:
+                found.add(para_id)
+                matches += occurrences
+                if matches >= stop_at:
+                    break
+        return matches
+    
+    for checked, para_norm in enumerate(paragraph_norms, 1):
+        if para_norm in normalized_source:
+            matches += 1
+            if matches >= stop_at:
+                break
+        elif matches + len(paragraph_norms) - checked < stop_at:
+            break  # The remaining paragraphs can no longer reach stop_at
+    return matches
+
 def verify_match(text_sentence: str, source_content: str, threshold: float = 0.75) -> bool:
     """Verify match with multiple techniques"""
     # Lower threshold to catch more matches (0.8 → 0.75)
@@ -93,18 +470,15 @@ async def detect_plagiarism(original_text: str, sources: List[Dict[str, Any]]) -
                 "full_text_with_highlights": f"<span class='highlight'>{original_text}</span>"
             }
 
-    # 1) embed once
-    orig_emb = _model.encode(original_text, convert_to_tensor=True)
+    # 1) embed the text and every source in one batch; unit-length vectors make a dot product the cosine
+    scored_sources = [src for src in sources if src.get("content")]
+    embeddings = await _encode_async([original_text] + [src["content"] for src in scored_sources])
+    scores = embeddings[1:] @ embeddings[0]  # [-1..1], one GEMV for all sources
     matches = []
     highest = 0.0
 
-    for src in sources:
-        content = src.get("content", "")
-        if not content:
-            continue
-
-        emb = _model.encode(content, convert_to_tensor=True)
-        score = util.cos_sim(orig_emb, emb).item()  # [-1..1]
+    for src, score in zip(scored_sources, scores.tolist()):
+        content = src["content"]
         pct = max(0.0, min(1.0, score)) * 100
 
         if pct >= 20.0:  # threshold, adjust as needed
@@ -123,50 +497,148 @@ async def detect_plagiarism(original_text: str, sources: List[Dict[str, Any]]) -
         "full_text_with_highlights": original_text
     }
 
-async def perform_plagiarism_check(text: str, sources: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """The actual plagiarism check logic with FAISS optimization - FIXED VERSION"""
+def _search_all_sources(source_embeddings: List[np.ndarray],
+                        text_embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Search every source sentence at once; returns (scores, corpus row ids), each shaped (n_text, k)"""
+    corpus = np.concatenate(source_embeddings).astype(np.float32)
+    k = min(SOURCE_CANDIDATES_K, corpus.shape[0])
+    
+    if settings.USE_FAISS:
+        # Embeddings are unit-length, so the flat inner-product index gives exact cosine top-k
+        index = create_faiss_index(corpus)
+        return index.search(np.ascontiguousarray(text_embeddings, dtype=np.float32), k)
     
-    # Add debug logging to track what's happening
-    import logging
-    logger = logging.getLogger(__name__)
+    device = get_sentence_model().device
+    similarity = torch.from_numpy(text_embeddings).to(device) @ torch.from_numpy(corpus).to(device).T
+    scores, ids = torch.topk(similarity, k, dim=1)
+    return scores.cpu().numpy(), ids.cpu().numpy()
+
+def _verify_sentence_match(normalized_text_sent: str, normalized_source_sent: str,
+                           use_exact_matching: bool, use_word_overlap: bool, word_overlap_threshold: float,
+                           min_chars_match: int, min_match_percent: float,
+                           window_cache: Optional[Dict[Tuple[str, int], frozenset]] = None) -> bool:
+    """Confirm an embedding match with actual text overlap between two deep-normalized sentences"""
+    # Only consider verified if there's SUBSTANTIAL exact text overlap
+    # CRITICAL FIX: Reduce verification threshold from 60% to 40%
+    min_match_length = max(min_chars_match, int(len(normalized_text_sent) * min_match_percent))
+    
+    # Check for exact substring match first (fastest)
+    is_verified = False
     
-    # CRITICAL FIX 1: Better normalization for full text comparison
-    def deep_normalize(content: str) -> str:
-        """Deeply normalize text for robust matching using configurable settings"""
-        if not content:
-            return ""
+    # 1. Direct normalized match
+    if use_exact_matching:
+        if (normalized_text_sent in normalized_source_sent or 
+            normalized_source_sent in normalized_text_sent):
+            is_verified = True
+        
+    # 2. Word-overlap match (more flexible)
+    elif use_word_overlap and len(normalized_text_sent) > 30:
+        text_words = set(normalized_text_sent.split())
+        source_words = set(normalized_source_sent.split())
         
-        # Apply normalization based on config
-        if settings.plagiarism.NORMALIZE_CASE:
-            content = content.lower()
+        if len(text_words) > 0:
+            word_overlap = len(text_words.intersection(source_words)) / len(text_words)
+            is_verified = word_overlap > word_overlap_threshold
     
-        if settings.plagiarism.NORMALIZE_WHITESPACE:
-            content = re.sub(r'\s+', ' ', content)  # Normalize all whitespace
+    # 3. Long enough common substring as last resort
+    if not is_verified:
+        # Only the threshold matters, so stop at the first shared window instead of computing the full LCS
+        is_verified = has_common_substring_at_least(normalized_text_sent, normalized_source_sent, min_match_length,
+                                                    window_cache)
     
-        if settings.plagiarism.NORMALIZE_PUNCTUATION:
-            content = re.sub(r'[^\w\s]', '', content)  # Remove punctuation
+    return is_verified
 
-        return content.strip()
+def _score_sources(source_sentences: List[List[str]], source_embeddings: List[np.ndarray],
+                   thresholds: np.ndarray, text_sentences: List[str],
+                   text_embeddings: np.ndarray) -> List[Tuple[int, int, Dict[str, Any]]]:
+    """Match text sentences against all sources in one search; returns verified (sentence, source, match) triples"""
+    if not settings.plagiarism.USE_SENTENCE_MATCHING or not source_sentences:
+        return []
     
-    # Extra robust normalization (handles more edge cases)
-    def extra_normalize(content: str) -> str:
-        """Even more aggressive normalization for truly difficult cases"""
-        if not content:
-            return ""
-        content = content.lower()
-        # Remove ALL non-alphanumeric characters (including spaces)
-        content = re.sub(r'[^a-z0-9]', '', content)
-        return content
+    scores, ids = _search_all_sources(source_embeddings, text_embeddings)
+    
+    # Map corpus rows back to their source, and to the sentence within that source
+    counts = np.array([len(sentences) for sentences in source_sentences], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    source_ids = np.repeat(np.arange(len(counts)), counts)
+    
+    # Threshold every candidate at once against its own source's bar;
+    # only candidates above it reach Python-level verification
+    valid = ids >= 0
+    candidate_rows = np.where(valid, ids, 0)
+    candidates = valid & (scores > thresholds[source_ids[candidate_rows]])
+    
+    # Bind the verification settings once rather than re-reading them for every candidate
+    plagiarism = settings.plagiarism
+    verify_options = (plagiarism.USE_EXACT_MATCHING, plagiarism.USE_WORD_OVERLAP,
+                      plagiarism.WORD_OVERLAP_THRESHOLD, plagiarism.MIN_CHARS_MATCH,
+                      plagiarism.MIN_MATCH_PERCENT)
+    # Long-sentence windows for this check only, so they're freed with the request
+    window_cache: Dict[Tuple[str, int], frozenset] = {}
+    
+    matches = []
+    for i in np.nonzero(candidates.any(axis=1))[0]:
+        i = int(i)
+        text_sentence = text_sentences[i]
+        
+        # CRITICAL FIX: Multiple normalization strategies for comparison
+        # (the text side is normalized once, however many candidates it has)
+        normalized_text_sent = deep_normalize(text_sentence)
+        
+        # Candidates come best-first; the first one that verifies wins the sentence
+        for rank in np.nonzero(candidates[i])[0]:
+            row = int(ids[i, rank])
+            source_idx = int(source_ids[row])
+            source_sentence = source_sentences[source_idx][row - offsets[source_idx]]
+            
+            if _verify_sentence_match(normalized_text_sent, deep_normalize(source_sentence), *verify_options,
+                                      window_cache):
+                # Store match details with ACTUAL matching source text
+                matches.append((i, source_idx, {
+                    "text_snippet": text_sentence,
+                    "source_snippet": source_sentence,
+                    "similarity_score": float(scores[i, rank] * 100),
+                    "verified": True
+                }))
+                break
+    
+    return matches
+
+async def perform_plagiarism_check(text: str, sources: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """The actual plagiarism check logic with FAISS optimization - FIXED VERSION"""
     
     # Log input data size
     logger.info(f"Checking text ({len(text)} chars) against {len(sources)} sources")
     
     # First try bi-directional exact match with normalized text
-    normalized_text = deep_normalize(text)
-    xnormalized_text = extra_normalize(text)
+    normalized_text, xnormalized_text = normalize_both(text)
+    
+    # Normalize the substantial paragraphs once and index them for a single-pass scan of each source
+    paragraph_norms = []
+    if settings.plagiarism.USE_PARAGRAPH_MATCHING:
+        paragraph_norms = [deep_normalize(para) for para in text.split("\n\n") if len(para.strip()) > 80]
+        paragraph_norms = [para_norm for para_norm in paragraph_norms if para_norm]
+    paragraph_automaton = build_paragraph_automaton(paragraph_norms)
+    
+    # Fewest matching paragraphs that clear the ratio threshold, so counting can stop there
+    total = len(paragraph_norms)
+    paragraphs_needed = next(
+        (m for m in range(1, total + 1) if m / total > settings.plagiarism.PARAGRAPH_SIMILARITY_THRESHOLD),
+        total + 1
+    )
+    
+    use_exact_matching = settings.plagiarism.USE_EXACT_MATCHING
+    
+    # Visit near-duplicate sources first so a hit returns before scanning the rest.
+    # Fingerprints are computed at scrape time; sources without one keep their order.
+    text_fingerprint = simhash64(text)
+    exact_candidates = sorted(
+        sources,
+        key=lambda src: hamming_distance(text_fingerprint, src["simhash"]) if src.get("simhash") is not None else 64
+    )
     
     # CRITICAL FIX: Try exact matching with more flexible normalization
-    for source in sources:
+    for source in exact_candidates:
         source_content = source.get("content", "").strip()
         source_url = source.get("url", "")
         
@@ -176,14 +648,13 @@ async def perform_plagiarism_check(text: str, sources: List[Dict[str, Any]]) ->
         logger.info(f"Checking against source: {source_url[:60]}...")
         
         # Try multiple normalization strategies
-        normalized_source = deep_normalize(source_content)
-        xnormalized_source = extra_normalize(source_content)
+        normalized_source, xnormalized_source = normalize_source(source_content)
         
         # EXACT MATCH: Use regular expressions to be more flexible with matching
         # This handles the case where the text is reformatted or has different line breaks
         
         # Check for substantial inclusion
-        if len(normalized_text) > 100 and settings.plagiarism.USE_EXACT_MATCHING:
+        if len(normalized_text) > 100 and use_exact_matching:
             # 1. Direct normalized text match - fastest check
             if normalized_text in normalized_source or normalized_source in normalized_text:
                 logger.info(f"EXACT MATCH FOUND: {source_url}")
@@ -196,25 +667,17 @@ async def perform_plagiarism_check(text: str, sources: List[Dict[str, Any]]) ->
                 return create_100_percent_result(text, source_url)
                 
             # 3. Paragraph-level matching
-            if settings.plagiarism.USE_PARAGRAPH_MATCHING:
-                paragraphs = text.split("\n\n")
-                matches = 0
-                total = 0
-            
-                for para in paragraphs:
-                    if len(para.strip()) > 80:  # Only check substantial paragraphs
-                        total += 1
-                        para_norm = deep_normalize(para)
-                        if para_norm in normalized_source:
-                            matches += 1
-            
-            # If more than 50% of paragraphs match exactly, it's a 100% match
-            if total > 0 and matches / total > settings.plagiarism.PARAGRAPH_SIMILARITY_THRESHOLD:
-                logger.info(f"PARAGRAPH MATCH FOUND: {matches}/{total} paragraphs match in {source_url}")
-                return create_100_percent_result(text, source_url)
+            if total > 0 and paragraphs_needed <= total:
+                matches = count_matching_paragraphs(paragraph_norms, paragraph_automaton, normalized_source,
+                                                    stop_at=paragraphs_needed)
+                
+                # If more than 50% of paragraphs match exactly, it's a 100% match
+                if matches >= paragraphs_needed:
+                    logger.info(f"PARAGRAPH MATCH FOUND: at least {matches}/{total} paragraphs match in {source_url}")
+                    return create_100_percent_result(text, source_url)
     
     # 2. Split text for multi-level analysis
-    text_sentences = await split_into_sentences(text)
+    text_sentences = split_into_sentences(text)
     text_sentences = [s for s in text_sentences if len(s) >= MIN_SENTENCE_LENGTH]
     
     # Limit the number of sentences to prevent performance issues
@@ -224,105 +687,49 @@ async def perform_plagiarism_check(text: str, sources: List[Dict[str, Any]]) ->
     verified_matches = []
     matched_sentences = set()
     
-    # Get embeddings for text sentences once
-    model = get_sentence_model()
-    text_sent_embeddings = model.encode(text_sentences, show_progress_bar=False)
-    
     # Track exactly which pieces of text matched which sources
     match_details = []
     
-    # 4. Process each source
-    for source_idx, source in enumerate(sources):
-        source_url = source.get("url", "")
-        source_content = source.get("content", "")
-        
-        # Skip empty sources
-        if not source_content or len(source_content.strip()) < 100:
-            continue
-        
-        # Get source sentences
-        source_sentences = await split_into_sentences(source_content)
-        source_sentences = [s for s in source_sentences if len(s) >= MIN_SENTENCE_LENGTH]
-        source_sentences = source_sentences[:MAX_SENTENCES]
-        
-        # Skip if empty
-        if not source_sentences:
-            continue
-        
-        # Source embeddings
-        source_sent_embeddings = model.encode(source_sentences, show_progress_bar=False)
-        
-        # CRITICAL FIX: Store the actual matching text from the source for display
-        source_matches = []
-        
-        # 5. Compare each text sentence with source sentences
-        for i, (text_sentence, text_embedding) in enumerate(zip(text_sentences, text_sent_embeddings)):
-            if i in matched_sentences:
-                continue  # Skip sentences we've already matched
-                
-            # Calculate similarities with source sentences
-            similarities = util.cos_sim(text_embedding, source_sent_embeddings)[0]
-            
-            # Find best match
-            best_idx = np.argmax(similarities.numpy())
-            best_score = similarities[best_idx].item()
-            
-            # CRITICAL FIX: Less stringent verification - reduced from 60% to 40%
-            if best_score > SIMILARITY_THRESHOLD and settings.plagiarism.USE_SENTENCE_MATCHING:
-                source_sentence = source_sentences[best_idx]
-                
-                # CRITICAL FIX: Multiple normalization strategies for comparison
-                normalized_text_sent = deep_normalize(text_sentence)
-                normalized_source_sent = deep_normalize(source_sentence)
-                
-                # Only consider verified if there's SUBSTANTIAL exact text overlap
-                # CRITICAL FIX: Reduce verification threshold from 60% to 40%
-                min_match_length = max(
-                    settings.plagiarism.MIN_CHARS_MATCH,
-                    int(len(normalized_text_sent) * settings.plagiarism.MIN_MATCH_PERCENT)
-                )
-                
-                # Check for exact substring match first (fastest)
-                is_verified = False
-                
-                # 1. Direct normalized match
-                if settings.plagiarism.USE_EXACT_MATCHING:
-                    if (normalized_text_sent in normalized_source_sent or 
-                        normalized_source_sent in normalized_text_sent):
-                        is_verified = True
-                    
-                # 2. Word-overlap match (more flexible)
-                elif settings.plagiarism.USE_WORD_OVERLAP and len(normalized_text_sent) > 30:
-                    text_words = set(normalized_text_sent.split())
-                    source_words = set(normalized_source_sent.split())
-                    
-                    if len(text_words) > 0:
-                        word_overlap = len(text_words.intersection(source_words)) / len(text_words)
-                        is_verified = word_overlap > settings.plagiarism.WORD_OVERLAP_THRESHOLD
-                
-                # 3. Longest common substring as last resort
-                if not is_verified:
-                    # Calculate longest common substring as fallback
-                    common_length = common_substring(normalized_text_sent, normalized_source_sent)
-                    is_verified = common_length >= min_match_length
-                
-                if is_verified:
-                    matched_sentences.add(i)
-                    
-                    # Store match details with ACTUAL matching source text
-                    source_matches.append({
-                        "text_snippet": text_sentence,
-                        "source_snippet": source_sentence,
-                        "similarity_score": float(best_score * 100),
-                        "verified": True
-                    })
-                    logger.info(f"Verified match: '{text_sentence[:30]}...' -> '{source_sentence[:30]}...'")
-        
-        # If we found verified matches for this source, add the source to our results
-        if source_matches:
+    # 4. Embed the text sentences and all uncached sources together, off the event loop
+    eligible_sources = [
+        (source.get("url", ""), source.get("content", ""))
+        for source in sources
+        if text_sentences and source.get("content") and len(source["content"].strip()) >= 100
+    ]
+    text_embeddings, source_vectors = await get_text_and_source_vectors(text_sentences, eligible_sources)
+    prepared_sources = [
+        (source_url, source_sentences, source_embeddings)
+        for (source_url, _), (source_sentences, source_embeddings) in zip(eligible_sources, source_vectors)
+        if source_sentences
+    ]
+    
+    # Per-source similarity thresholds, built once: Wikipedia mirrors much of the web, so it needs a stricter bar
+    is_wiki = np.array(["wikipedia.org" in source_url for source_url, _, _ in prepared_sources], dtype=bool)
+    thresh_per_src = np.where(is_wiki, WIKIPEDIA_THRESHOLD, SIMILARITY_THRESHOLD).astype(np.float32)
+    
+    # 5. One search over every source sentence, with verification, off the event loop
+    loop = asyncio.get_running_loop()
+    verified = await loop.run_in_executor(
+        _SCORING_EXECUTOR, _score_sources,
+        [source_sentences for _, source_sentences, _ in prepared_sources],
+        [source_embeddings for _, _, source_embeddings in prepared_sources],
+        thresh_per_src, text_sentences, text_embeddings
+    )
+    
+    # Group verified matches by source, keeping source order for the response
+    # CRITICAL FIX: Store the actual matching text from the source for display
+    source_matches = [[] for _ in prepared_sources]
+    for i, source_idx, match in verified:
+        matched_sentences.add(i)
+        source_matches[source_idx].append(match)
+        logger.info(f"Verified match: '{match['text_snippet'][:30]}...' -> '{match['source_snippet'][:30]}...'")
+    
+    # If we found verified matches for a source, add the source to our results
+    for (source_url, _, _), matches in zip(prepared_sources, source_matches):
+        if matches:
             match_details.append({
                 "source_url": source_url,
-                "matches": source_matches
+                "matches": matches
             })
     
     # 6. Build final result
@@ -347,25 +754,13 @@ async def perform_plagiarism_check(text: str, sources: List[Dict[str, Any]]) ->
     
     logger.info(f"Final plagiarism result: {plagiarism_percentage}% from {len(api_matches)} matches")
     
-    # Create highlighted text
-    highlighted_text = text
-    
-    # Sort matches by position in text (reverse order to preserve positions)
-    text_matches = []
-    for i in sorted(matched_sentences):
-        if i < len(text_sentences):
-            sentence = text_sentences[i]
-            start = text.find(sentence)
-            if start >= 0:
-                text_matches.append((start, start + len(sentence)))
+    # Locate each matched sentence in the text
+    sentence_spans = locate_sentences(text, text_sentences)
+    text_matches = [sentence_spans[i] for i in sorted(matched_sentences)
+                    if i < len(sentence_spans) and sentence_spans[i][0] >= 0]
     
-    # Sort by start position in reverse order to avoid messing up indices
-    text_matches.sort(reverse=True)
-    
-    # Apply highlighting
-    for start, end in text_matches:
-        highlighted_text = highlighted_text[:end] + "</span>" + highlighted_text[end:]
-        highlighted_text = highlighted_text[:start] + "<span class='highlight'>" + highlighted_text[start:]
+    # Create highlighted text
+    highlighted_text = render_highlights(text, text_matches)
     
     return {
         "plagiarism_percentage": plagiarism_percentage,
@@ -373,6 +768,84 @@ async def perform_plagiarism_check(text: str, sources: List[Dict[str, Any]]) ->
         "full_text_with_highlights": highlighted_text
     }
 
+def _merge_spans_py(starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge overlapping or touching (start, end) spans; starts must be sorted ascending"""
+    n = starts.shape[0]
+    merged_starts = np.empty(n, dtype=np.int64)
+    merged_ends = np.empty(n, dtype=np.int64)
+    if n == 0:
+        return merged_starts, merged_ends
+    
+    count = 0
+    merged_starts[0] = starts[0]
+    merged_ends[0] = ends[0]
+    for k in range(1, n):
+        if starts[k] <= merged_ends[count]:
+            if ends[k] > merged_ends[count]:
+                merged_ends[count] = ends[k]
+        else:
+            count += 1
+            merged_starts[count] = starts[k]
+            merged_ends[count] = ends[k]
+    
+    return merged_starts[:count + 1], merged_ends[:count + 1]
+
+def _merge_spans(starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge sorted spans, compiling the loop with numba on first call (pure Python if numba is missing)"""
+    global _merge_spans_impl
+    if _merge_spans_impl is None:
+        try:
+            from numba import njit
+            _merge_spans_impl = njit(cache=True)(_merge_spans_py)
+        except ImportError:
+            _merge_spans_impl = _merge_spans_py
+    return _merge_spans_impl(starts, ends)
+
+def locate_sentences(text: str, sentences: List[str]) -> List[Tuple[int, int]]:
+    """
+    Find the (start, end) span of each sentence in text, or (-1, -1) if it isn't there
+    
+    Sentences are in text order, so the search resumes after the previous hit: the
+    whole scan is one linear pass, and a repeated sentence maps to its own occurrence.
+    """
+    spans = []
+    cursor = 0
+    for sentence in sentences:
+        start = text.find(sentence, cursor)
+        if start < 0:
+            # Out of order (e.g. the tokenizer reshaped the text); search from the top
+            start = text.find(sentence)
+        if start < 0:
+            spans.append((-1, -1))
+            continue
+        
+        end = start + len(sentence)
+        spans.append((start, end))
+        cursor = max(cursor, end)
+    return spans
+
+def render_highlights(text: str, spans: List[Tuple[int, int]]) -> str:
+    """Wrap the given (start, end) character spans of text in highlight tags"""
+    if not spans:
+        return text
+    
+    spans = sorted(spans)
+    starts = np.fromiter((start for start, _ in spans), dtype=np.int64, count=len(spans))
+    ends = np.fromiter((end for _, end in spans), dtype=np.int64, count=len(spans))
+    merged_starts, merged_ends = _merge_spans(starts, ends)
+    
+    # Build the output in one join instead of re-slicing the whole text per span
+    parts = []
+    cursor = 0
+    for start, end in zip(merged_starts.tolist(), merged_ends.tolist()):
+        parts.append(text[cursor:start])
+        parts.append("<span class='highlight'>")
+        parts.append(text[start:end])
+        parts.append("</span>")
+        cursor = end
+    parts.append(text[cursor:])
+    return "".join(parts)
+
 def create_100_percent_result(text: str, source_url: str) -> Dict[str, Any]:
     """Helper to create a 100% plagiarism result"""
     return {
@@ -408,7 +881,7 @@ def extract_domain(url: str) -> str:
     except:
         return url  # Fallback to full URL if parsing fails
         
-async def split_text_into_chunks(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> List[str]:
+def split_text_into_chunks(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> List[str]:
     """Split text into chunks with overlap"""
     words = text.split()
     chunks = []
@@ -419,13 +892,31 @@ async def split_text_into_chunks(text: str, chunk_size: int = CHUNK_SIZE, overla
     
     return chunks
 
-async def split_into_sentences(text: str) -> List[str]:
+def split_into_sentences(text: str) -> List[str]:
     """Split text into sentences with improved robustness"""
+    return list(_split_into_sentences_cached(text))
+
+# Keyed by whole page texts; a handful covers repeats within and across concurrent requests
+@lru_cache(maxsize=32)
+def _split_into_sentences_cached(text: str) -> Tuple[str, ...]:
+    """Memoized split: a compiled regex first, NLTK only when the regex finds no boundaries"""
+    sentences = [s.strip() for s in _SENT_SPLIT_RE.split(text) if s.strip()]
+    if len(sentences) < 2 and len(text) >= REGEX_SPLIT_MIN_LENGTH:
+        # A long text with no recognizable boundary (e.g. lowercase after periods) - let NLTK try
+        sentences = _split_with_nltk(text)
+    return tuple(sentences)
+
+def _split_with_nltk(text: str) -> List[str]:
+    """Split text into sentences with NLTK Punkt, degrading to regex splits if it fails"""
+    global _warned
+    
     # First attempt: direct NLTK tokenization
     try:
         return nltk.sent_tokenize(text)
     except Exception as first_error:
-        print(f"Primary NLTK tokenization failed: {str(first_error)}")
+        if not _warned:
+            logger.warning(f"Primary NLTK tokenization failed, using regex fallback: {str(first_error)}")
+            _warned = True
         
         # Second attempt: RegEx approach
         try:
@@ -434,23 +925,42 @@ async def split_into_sentences(text: str) -> List[str]:
             if sentences and len(sentences) > 1:
                 return [s.strip() for s in sentences if s.strip()]
         except Exception as second_error:
-            print(f"RegEx tokenization failed: {str(second_error)}")
+            logger.warning(f"RegEx tokenization failed: {str(second_error)}")
         
         # Last resort: simple split
         sentences = re.split(r'[.!?]', text)
         return [s.strip() for s in sentences if s.strip()]
 
-def common_substring(str1: str, str2: str) -> int:
-    """Find the longest common substring between two strings"""
-    str1, str2 = str1.lower(), str2.lower()
-    m, n = len(str1), len(str2)
-    dp = [[0 for _ in range(n+1)] for _ in range(m+1)]
-    longest = 0
+def _substring_windows(text: str, length: int) -> frozenset:
+    """All substrings of text with the given length"""
+    return frozenset(text[j:j + length] for j in range(len(text) - length + 1))
+
+def has_common_substring_at_least(str1: str, str2: str, length: int,
+                                  window_cache: Optional[Dict[Tuple[str, int], frozenset]] = None) -> bool:
+    """
+    Whether two strings share a substring of at least `length` characters, stopping at the first hit
     
-    for i in range(1, m+1):
-        for j in range(1, n+1):
-            if str1[i-1] == str2[j-1]:
-                dp[i][j] = dp[i-1][j-1] + 1
-                longest = max(longest, dp[i][j])
+    window_cache, if given, keeps the long side's windows across calls; callers
+    scope it to one plagiarism check so the sets don't outlive the request.
+    """
+    if length <= 0:
+        return True
+    
+    # Any common substring that long contains one of exactly `length` characters,
+    # so sliding a window of that size over the shorter string is enough
+    a, b = sorted((str1.lower(), str2.lower()), key=len)
+    if len(a) < length:
+        return False
+    
+    if len(b) > LONG_SUBSTRING_HAYSTACK:
+        # Hash every window of the long side once; each probe is then a set lookup
+        if window_cache is None:
+            windows = _substring_windows(b, length)
+        else:
+            windows = window_cache.get((b, length))
+            if windows is None:
+                windows = window_cache[(b, length)] = _substring_windows(b, length)
+        return any(a[i:i + length] in windows for i in range(len(a) - length + 1))
     
-    return longest
\ No newline at end of file
+    # str.__contains__ runs CPython's C-level fast search
+    return any(a[i:i + length] in b for i in range(len(a) - length + 1))
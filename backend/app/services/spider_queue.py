@@ -3,6 +3,7 @@ import time
 import logging
 from typing import Dict, Any, Callable, Awaitable, List, Optional
 import uuid
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -50,8 +51,9 @@ class SpiderQueue:
                 # Execute with semaphore
                 async with self.semaphore:
                     try:
-                        # Add delay for rate limiting
-                        await asyncio.sleep(1)
+                        # Optional delay for rate limiting (off by default)
+                        if settings.scraper.QUEUE_DELAY_S > 0:
+                            await asyncio.sleep(settings.scraper.QUEUE_DELAY_S)
                         
                         # Execute the function
                         self.results[task_id] = {
@@ -96,17 +98,13 @@ class SpiderQueue:
     
     def cleanup_old_results(self, max_age_hours: int = 24):
         """Clean up old results to prevent memory leaks"""
-        current_time = time.time()
-        max_age_seconds = max_age_hours * 60 * 60
-        to_remove = []
+        cutoff = time.time() - max_age_hours * 60 * 60
         
-        for task_id, result in self.results.items():
-            if result.get("status") == "completed" or result.get("status") == "failed":
-                if current_time - result.get("end_time", 0) > max_age_seconds:
-                    to_remove.append(task_id)
-        
-        for task_id in to_remove:
-            del self.results[task_id]
+        # Keep running tasks and anything that finished recently
+        self.results = {
+            task_id: result for task_id, result in self.results.items()
+            if result.get("status") not in ("completed", "failed") or result.get("end_time", 0) >= cutoff
+        }
 
 # Singleton instance
 spider_queue = SpiderQueue()
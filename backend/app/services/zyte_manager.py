@@ -1,74 +1,635 @@
-from typing import Dict, Any, Optional, List, Callable
+from typing import Dict, Any, Optional, List, Callable, Tuple, Union, AsyncIterator
 import aiohttp
 import asyncio
 import logging
 from urllib.parse import urlparse
+from functools import lru_cache
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import os
+import codecs
+import socket
 from app.services.cache_manager import ScrapeCache
-from bs4 import BeautifulSoup
+from app.services.fingerprint import simhash64
+from app.services.html_extract import (extract_main_content, MAIN_SELECTORS, ZYTE_MAIN_SELECTORS,
+                                       NOISE_CLASSES, WHITESPACE_RE)
+from app.core.config import settings
+from bs4 import BeautifulSoup, SoupStrainer
 import re
 import time
 import random
 import json
 
+try:
+    import orjson
+    _json_loads = orjson.loads  # Decodes bytes directly, several times faster than json
+    _json_dumps = orjson.dumps  # Emits UTF-8 bytes directly
+except ImportError:
+    _json_loads = json.loads
+    def _json_dumps(value: Any) -> bytes:
+        return json.dumps(value).encode()
+
 logger = logging.getLogger(__name__)
 
+# Global cap on in-flight scrapes, shared by every router instance
+SCRAPE_SEMAPHORE = asyncio.Semaphore(settings.ZYTE_MAX_CONCURRENCY or 10)
+
+# Retry transient failures (rate limiting, overload, dropped connections) with exponential backoff
+SCRAPE_RETRIES = 3
+RETRYABLE_STATUSES = {429, 503}
+
+# Bound direct page fetches so one stalled URL can't hold up the whole batch
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=20, connect=5)
+# Default for every other request made through the shared session
+SESSION_TIMEOUT = aiohttp.ClientTimeout(total=45, connect=10, sock_read=30)
+# Parallel lookups when pre-resolving a batch's hosts
+DNS_WARMUP_CONCURRENCY = 32
+# How long resolved addresses are reused by the scraper session
+DNS_CACHE_TTL_S = 300
+
+# Delay before speculatively starting each next tier of a fallback chain
+FALLBACK_STAGGER_S = (5, 15)
+
+# Requests in flight to any one host, on top of the per-service limits
+HOST_MAX_CONCURRENCY = 4
+# Requests per second started against any one host (evenly spaced, no bursts)
+HOST_RATE_PER_S = 10
+# Longest Retry-After we honour before the next request to that host
+RETRY_AFTER_MAX_S = 60
+# A host's slot, backoff and rate-limit state is dropped after this long without requests
+HOST_STATE_IDLE_S = 300
+# A scrape needs more content than this to be cached or handed to callers as a source
+MIN_USABLE_CONTENT = 200
+# Thin scrapes in a row before a domain is skipped by batch scrapes (for the cache's bad-domain TTL)
+BAD_DOMAIN_THRESHOLD = 3
+
+# Worker processes for HTML parsing and content extraction
+PARSE_WORKERS = os.cpu_count() or 1
+
+# Scrapy Cloud URLs arriving close together share one spider job, up to CLOUD_BATCH_SIZE per job.
+# A batch is sent as soon as it's full, when no new URL has arrived for CLOUD_BATCH_QUIET_S, or
+# at the latest CLOUD_BATCH_MAX_WAIT_S after its first URL, so a lone URL waits a fraction of a second.
+CLOUD_BATCH_QUIET_S = 0.1
+CLOUD_BATCH_MAX_WAIT_S = 0.5
+CLOUD_BATCH_SIZE = 25
+# Time allowed for a spider job to finish and for its items to download, plus extra per URL in the job
+JOB_TIMEOUT_S = 90
+JOB_TIMEOUT_PER_URL_S = 10
+JOB_ITEMS_TIMEOUT_S = 15
+JOB_ITEMS_TIMEOUT_PER_URL_S = 2
+# How often the shared poller checks on pending Scrapy Cloud jobs (when the webhook is off)
+JOB_POLL_INTERVAL_S = 5
+# Read size when streaming job items from Scrapy Cloud storage
+JOB_ITEMS_CHUNK_SIZE = 64 * 1024
+
+# Only the tags content extraction looks at get parsed; <head> noise, top-level nav/footer etc. are skipped
+_PARSE_STRAINER = SoupStrainer(['title', 'article', 'main', 'section', 'div', 'p', 'h1', 'h2', 'h3'])
+
+# Substring patterns for classify_site_complexity, one compiled alternation per service tier
+# Academic/complex sites - use Scrapy Cloud (full browser rendering)
+_ACADEMIC_SITE_RE = re.compile('|'.join(map(re.escape, (
+    'sciencedirect', 'springer', 'wiley', 'pubmed',
+    'ncbi', 'ieee', 'jstor', 'elsevier', 'nature',
+    'academia.edu', 'researchgate', 'frontiers', 'oxford',
+    'tandfonline', 'sage', 'nih.gov', 'acm.org'
+))))
+# News/medium complexity - use Zyte API (faster than Scrapy Cloud)
+_NEWS_SITE_RE = re.compile('|'.join(map(re.escape, (
+    'news', 'blog', 'times', 'post', '.gov', 'cnn',
+    'bbc', 'guardian', 'nytimes', 'washingtonpost',
+    'medium.com', 'reuters', 'bloomberg'
+))))
+# JavaScript-heavy sites (checked against domain and path) - use Zyte API
+_JS_SITE_RE = re.compile('|'.join(map(re.escape, ('angular', 'react', 'vue', 'spa', 'dashboard', 'app.'))))
+
+@lru_cache(maxsize=8192)
+def _urlparts(url: str) -> Tuple[str, str, str]:
+    """(lowercased netloc, lowercased path, scheme) of a URL, parsed once per URL"""
+    parsed = urlparse(url)
+    return parsed.netloc.lower(), parsed.path.lower(), parsed.scheme
+
+@lru_cache(maxsize=4096)
+def _classify_domain(domain: str) -> Optional[str]:
+    """Service tier implied by the domain alone, or None; batches repeat hosts so results are memoized"""
+    if _ACADEMIC_SITE_RE.search(domain):
+        return "scrapy_cloud"
+    if _NEWS_SITE_RE.search(domain) or _JS_SITE_RE.search(domain):
+        return "zyte_api"
+    return None
+
+# classify_website categories, highest priority first
+_SITE_CATEGORIES = ('scientific', 'news', 'complex')
+# 1. TLD-based classification: true suffixes, checked with one str.endswith
+_SCIENTIFIC_TLDS = ('.edu', '.ac.uk', '.ac.jp')
+# (category index, where the substring may occur, substrings)
+_SITE_PATTERN_GROUPS = (
+    # Academic labels that can sit anywhere in the host name
+    (0, 'domain', ('.ac.', '.research.')),
+    # 2. Domain name pattern matching (scientific publishers)
+    (0, 'domain', ('science', 'research', 'journal', 'academic', 'scholar',
+                   'university', 'institute', 'lab', 'proceedings', 'publications',
+                   'springer', 'wiley', 'elsevier', 'nature', 'cell', 'pubmed',
+                   'sciencedirect', 'frontiers', 'arxiv', 'ieee', 'acm', 'jstor')),
+    # 3. URL path analysis
+    (0, 'path', ('/article/', '/journal/', '/abstract/', '/doi/', '/publication/',
+                 '/paper/', '/research/', '/science/', '/content/', '/fulltext/')),
+    # 4. News site detection
+    (1, 'domain', ('news', 'times', 'post', 'tribune', 'herald',
+                   'guardian', 'bbc', 'cnn', 'nyt', 'reuters', 'bloomberg')),
+    # 5. Complex site detection (JavaScript-heavy sites)
+    (2, 'any', ('angular', 'react', 'vue', 'spa', 'dashboard', 'app.',
+                'facebook', 'twitter', 'linkedin', 'instagram', 'youtube')),
+)
+
+def _build_site_automaton():
+    """Aho-Corasick automaton over every classify_website substring, or None without pyahocorasick"""
+    try:
+        import ahocorasick
+    except ImportError:
+        return None
+    
+    # A substring can belong to several groups, so each maps to all its (category, scope) pairs
+    entries = defaultdict(list)
+    for category, scope, patterns in _SITE_PATTERN_GROUPS:
+        for pattern in patterns:
+            entries[pattern].append((category, scope))
+    
+    automaton = ahocorasick.Automaton()
+    for pattern, values in entries.items():
+        automaton.add_word(pattern, tuple(values))
+    automaton.make_automaton()
+    return automaton
+
+_SITE_AUTOMATON = _build_site_automaton()
+
+def _compile_site_patterns():
+    """One alternation regex per (category, scope), used when pyahocorasick is not installed"""
+    grouped = defaultdict(list)
+    for category, scope, patterns in _SITE_PATTERN_GROUPS:
+        grouped[(category, scope)].extend(patterns)
+    return tuple((category, scope, re.compile('|'.join(map(re.escape, patterns))))
+                 for (category, scope), patterns in sorted(grouped.items()))
+
+_SITE_PATTERN_RES = _compile_site_patterns()
+
+def _site_priority(text: str, scope: str) -> int:
+    """Best category index among patterns allowed in scope that occur in text, len(_SITE_CATEGORIES) if none"""
+    best = len(_SITE_CATEGORIES)
+    if _SITE_AUTOMATON is not None:
+        # One pass over text finds every pattern at once
+        for _, values in _SITE_AUTOMATON.iter(text):
+            for category, pattern_scope in values:
+                if category < best and pattern_scope in (scope, 'any'):
+                    best = category
+        return best
+    
+    # Groups are sorted by category, so the first hit is the best one
+    for category, pattern_scope, pattern_re in _SITE_PATTERN_RES:
+        if pattern_scope in (scope, 'any') and pattern_re.search(text):
+            return category
+    return best
+
+@lru_cache(maxsize=4096)
+def _domain_site_priority(domain: str) -> int:
+    """_site_priority for a domain; batches keep hitting the same hosts"""
+    if domain.partition(':')[0].endswith(_SCIENTIFIC_TLDS):
+        return 0
+    return _site_priority(domain, 'domain')
+
+_ACADEMIC_SELECTORS = (
+    'article', '.article', '.article-body', '.paper', '.content-block',
+    '#content', '.content', '.main-content', '.article-content',
+    '.publication-content', '.research-article', '.fulltext-view',
+    '.article-fulltext', '.article__body', '.article__sections',
+    '#main-content', '.section-container', '.page-content',
+    '#abstract', '.abstract', '.abstractSection', '.abstract-content',
+    '#body', '.body', '.fulltext', '.full-text', '#full-text-content',
+    '.article-text', '.article-section__content', '.article-section'
+)
+
+_ACADEMIC_UNWANTED_CSS = ('script, style, noscript, svg, iframe, '
+                          'nav, .nav, header, footer, .header, .footer, .figure, .fig, .author-info, .references, '
+                          'aside, .aside, .metrics, .extra, .supplementary, .article-tools')
+
+# Charset declared in the page itself, looked for near the top when the header has none
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([A-Za-z0-9_-]+)', re.IGNORECASE)
+
+# Boilerplate stripped by _clean_content
+_BOILERPLATE_RES = [re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'Copyright ©.*?(\.|$)',
+    r'All rights reserved\.?',
+    r'Terms (of|and) (use|service|conditions).*?(\.|$)',
+    r'Privacy Policy\.?',
+    r'Cookie Policy\.?',
+    r'\d+ views',
+    r'\d+ comments',
+    r'Share this:',
+    r'Follow us on:',
+    r'Last updated:.*?(\.|$)'
+)]
+
+def _parse_html(html: str) -> BeautifulSoup:
+    """Parse the content-bearing parts of a page with the C-based lxml parser"""
+    return BeautifulSoup(html, 'lxml', parse_only=_PARSE_STRAINER)
+
+def _response_encoding(response: aiohttp.ClientResponse, raw: bytes) -> str:
+    """Charset from Content-Type or a <meta> tag, else utf-8; unlike response.text() never runs chardet"""
+    encoding = response.charset
+    if not encoding:
+        match = _META_CHARSET_RE.search(raw, 0, 4096)
+        encoding = match.group(1).decode('ascii') if match else 'utf-8'
+    try:
+        return codecs.lookup(encoding).name
+    except LookupError:
+        return 'utf-8'
+
+def _make_resolver() -> aiohttp.abc.AbstractResolver:
+    """aiodns-backed resolver when available, so lookups don't queue on the default thread pool"""
+    try:
+        import aiodns  # noqa: F401
+    except ImportError:
+        return aiohttp.ThreadedResolver()
+    return aiohttp.AsyncResolver(nameservers=settings.scraper.DNS_NAMESERVERS or None)
+
+class CachingResolver(aiohttp.abc.AbstractResolver):
+    """
+    TTL cache in front of another resolver, shared by concurrent lookups of the same host
+    
+    The session's connector resolves through this (with its own DNS cache off),
+    so warm_dns can prime the cache with plain resolve() calls.
+    """
+    
+    def __init__(self, resolver: aiohttp.abc.AbstractResolver, ttl: float = DNS_CACHE_TTL_S):
+        self._resolver = resolver
+        self._ttl = ttl
+        self._cache: Dict[Tuple[str, int, int], Tuple[float, List[Dict[str, Any]]]] = {}
+        self._in_flight: Dict[Tuple[str, int, int], asyncio.Future] = {}
+    
+    async def resolve(self, host: str, port: int = 0, family: int = socket.AF_INET) -> List[Dict[str, Any]]:
+        key = (host, port, family)
+        cached = self._cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        
+        task = self._in_flight.get(key)
+        if task is None:
+            task = self._in_flight[key] = asyncio.ensure_future(self._lookup(key))
+        # Shielded so one cancelled caller doesn't fail the lookup for the others
+        return await asyncio.shield(task)
+    
+    async def _lookup(self, key: Tuple[str, int, int]) -> List[Dict[str, Any]]:
+        try:
+            addresses = await self._resolver.resolve(*key)
+        finally:
+            del self._in_flight[key]
+        # Drop expired answers as new ones come in, so hosts seen once don't accumulate
+        now = time.monotonic()
+        self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+        self._cache[key] = (now + self._ttl, addresses)
+        return addresses
+    
+    async def close(self):
+        self._cache.clear()
+        await self._resolver.close()
+
+def _new_parse_pool() -> ProcessPoolExecutor:
+    """
+    Process pool for extract_main_content; spawned so workers don't inherit the app's threads
+    
+    Workers unpickle html_extract, which imports nothing from the app, so they
+    don't load the embedding model either.
+    """
+    return ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+
+class AdmissionSlot:
+    """
+    Concurrency limit built on asyncio.Condition whose size can change at runtime
+    
+    Used like an asyncio.Semaphore. backoff() halves the limit when a service
+    starts rate limiting and recover() grows it back one slot per success, up
+    to the size it was created with.
+    """
+    
+    def __init__(self, max_concurrency: int):
+        self._active = 0
+        self._waiting = 0
+        self._max = max_concurrency
+        self._ceiling = max_concurrency
+        self._cond = asyncio.Condition()
+    
+    @property
+    def max_concurrency(self) -> int:
+        return self._max
+    
+    @property
+    def idle(self) -> bool:
+        """No slot held and nobody waiting for one"""
+        return self._active == 0 and self._waiting == 0
+    
+    async def acquire(self):
+        async with self._cond:
+            self._waiting += 1
+            try:
+                await self._cond.wait_for(lambda: self._active < self._max)
+            except asyncio.CancelledError:
+                # We may have been the waiter release() notified; pass the wakeup on so it isn't lost
+                if self._active < self._max:
+                    self._cond.notify(1)
+                raise
+            finally:
+                self._waiting -= 1
+            self._active += 1
+    
+    async def release(self):
+        async with self._cond:
+            self._active -= 1
+            self._cond.notify(1)
+    
+    async def resize(self, max_concurrency: int):
+        """Set a new limit (at least 1); waiters are woken if it grew"""
+        async with self._cond:
+            grew = max_concurrency > self._max
+            self._max = max(1, max_concurrency)
+            if grew:
+                self._cond.notify_all()
+    
+    async def backoff(self):
+        await self.resize(self._max // 2)
+    
+    async def recover(self):
+        if self._max < self._ceiling:
+            await self.resize(self._max + 1)
+    
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.release()
+
 class ZyteServiceRouter:
     """Routes scraping requests to appropriate Zyte service based on site complexity"""
     
-    def __init__(self, api_key: str, project_id: str):
+    def __init__(self, api_key: str, project_id: str, session: Optional[aiohttp.ClientSession] = None):
         self.api_key = api_key
         self.project_id = project_id
-        self.http_semaphore = asyncio.Semaphore(10)  # Allow more HTTP requests (faster)
-        self.zyte_semaphore = asyncio.Semaphore(2)   # Limit Zyte API requests (rate limits)
-        self.cloud_semaphore = asyncio.Semaphore(1)  # Limit Scrapy Cloud requests (expensive)
-        self.session = None
+        self.http_semaphore = AdmissionSlot(10)  # Allow more HTTP requests (faster)
+        self.zyte_semaphore = AdmissionSlot(2)   # Limit Zyte API requests (rate limits)
+        self.cloud_semaphore = AdmissionSlot(1)  # Limit Scrapy Cloud requests (expensive)
+        # An injected session is borrowed: the caller keeps ownership and closes it
+        self.session = session
+        self._owns_session = session is None
+        self._resolver = None
+        self._parse_pool = None
         self.cache = ScrapeCache()
+        
+        # Per-host admission, plus the earliest time a host said we may come back (Retry-After)
+        self._host_buckets: Dict[str, AdmissionSlot] = defaultdict(lambda: AdmissionSlot(HOST_MAX_CONCURRENCY))
+        self._host_retry_at: Dict[str, float] = {}
+        # Earliest time the next request to each host may start (rate limit)
+        self._host_next_at: Dict[str, float] = {}
+        self._host_sweep_at = 0.0
+        
+        # Scrapy Cloud micro-batcher state
+        self._cloud_pending: List[Tuple[str, asyncio.Future]] = []
+        self._cloud_wakeup = asyncio.Event()
+        self._cloud_arrival = asyncio.Event()
+        self._cloud_batcher_task = None
+        self._cloud_jobs = set()
+        # Scrapy Cloud jobs waiting to be settled by the webhook or the shared poller
+        self._pending_jobs: Dict[str, asyncio.Future] = {}
+        self._job_poller_task = None
+    
+    async def start(self):
+        """
+        Open the long-lived aiohttp session
+        
+        Connections stay alive between scrapes and DNS answers are cached, so
+        repeat hits on the same hosts skip the DNS lookup and TLS handshake.
+        """
+        if self._parse_pool is None:
+            self._parse_pool = _new_parse_pool()
+        if self.session and not self.session.closed:
+            return
+        self._resolver = CachingResolver(_make_resolver())
+        connector = aiohttp.TCPConnector(
+            resolver=self._resolver,
+            limit=100,
+            limit_per_host=4,
+            use_dns_cache=False,  # CachingResolver caches instead
+            keepalive_timeout=75,
+            enable_cleanup_closed=True
+        )
+        self.session = aiohttp.ClientSession(connector=connector, timeout=SESSION_TIMEOUT)
+        self._owns_session = True
     
     async def get_session(self):
-        """Get or create an aiohttp ClientSession"""
+        """Get the shared aiohttp ClientSession, opening it on first use"""
         if not self.session or self.session.closed:
-            self.session = aiohttp.ClientSession()
+            await self.start()
         return self.session
     
+    async def close(self):
+        """Close the aiohttp ClientSession"""
+        if self._cloud_batcher_task:
+            self._cloud_batcher_task.cancel()
+            self._cloud_batcher_task = None
+        if self._job_poller_task:
+            self._job_poller_task.cancel()
+            self._job_poller_task = None
+        for _, future in self._cloud_pending:
+            future.cancel()
+        self._cloud_pending.clear()
+        # In-flight spider jobs cancel their callers' futures on the way out
+        jobs = list(self._cloud_jobs)
+        for task in jobs:
+            task.cancel()
+        await asyncio.gather(*jobs, return_exceptions=True)
+        self._cloud_jobs.clear()
+        
+        if self._owns_session and self.session and not self.session.closed:
+            await self.session.close()
+        if self._resolver is not None:
+            await self._resolver.close()
+            self._resolver = None
+        self.session = None
+        
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(wait=False, cancel_futures=True)
+            self._parse_pool = None
+    
+    async def _extract(self, html: Union[str, bytes], max_rank: int,
+                       noise_classes: frozenset = frozenset(), encoding: str = 'utf-8') -> Tuple[str, str]:
+        """Run extract_main_content in the parse pool so the event loop keeps serving network I/O"""
+        loop = asyncio.get_running_loop()
+        args = (extract_main_content, html, max_rank, noise_classes, encoding)
+        try:
+            return await loop.run_in_executor(self._parse_pool, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a huge page); replace the pool and retry once
+            logger.warning("Parse pool broken, restarting it")
+            self._parse_pool = _new_parse_pool()
+            return await loop.run_in_executor(self._parse_pool, *args)
+    
+    async def warm_dns(self, urls: List[str]):
+        """
+        Resolve every distinct host in a batch up front
+        
+        Answers land in the session's CachingResolver, so a batch that keeps
+        hitting a handful of domains does one lookup per host, all in parallel.
+        """
+        await self.get_session()
+        if self._resolver is None:
+            # Injected session: its resolver isn't ours to prime
+            return
+        hosts = set()
+        for url in urls:
+            parsed = urlparse(url)
+            if parsed.hostname:
+                hosts.add((parsed.hostname, parsed.port or (443 if parsed.scheme == 'https' else 80)))
+        
+        semaphore = asyncio.Semaphore(DNS_WARMUP_CONCURRENCY)
+        
+        async def resolve(host: str, port: int):
+            async with semaphore:
+                try:
+                    # Same family the connector asks for, so its lookups hit these entries
+                    await self._resolver.resolve(host, port, socket.AF_UNSPEC)
+                except Exception as e:
+                    logger.debug(f"DNS warmup failed for {host}: {str(e)}")
+        
+        await asyncio.gather(*(resolve(host, port) for host, port in hosts))
+    
+    async def _track_status(self, slot: AdmissionSlot, status: int):
+        """
+        Shrink a slot's concurrency when it pushes back, grow it again as requests succeed
+        
+        Pass the host's bucket for direct requests, so one rate-limiting origin
+        only slows itself; service slots (Zyte API) back off globally.
+        """
+        if status in RETRYABLE_STATUSES:
+            await slot.backoff()
+            logger.warning(f"Backing off: concurrency limit now {slot.max_concurrency} after HTTP {status}")
+        elif status == 200:
+            await slot.recover()
+    
+    @asynccontextmanager
+    async def _host_slot(self, url: str):
+        """Hold one of the URL host's slots, first waiting out any Retry-After it sent and the host's rate limit"""
+        host = _urlparts(url)[0]
+        self._prune_host_state()
+        async with self._host_buckets[host]:
+            delay = self._host_retry_at.get(host, 0) - time.monotonic()
+            if delay > 0:
+                logger.info(f"Waiting {delay:.1f}s before retrying {host} (Retry-After)")
+                await asyncio.sleep(delay)
+            
+            # Reserve the host's next start time so bursts are spread out instead of drawing 429s
+            now = time.monotonic()
+            start_at = max(now, self._host_next_at.get(host, 0))
+            self._host_next_at[host] = start_at + 1 / HOST_RATE_PER_S
+            if start_at > now:
+                await asyncio.sleep(start_at - now)
+            yield
+    
+    def _prune_host_state(self):
+        """Every so often, forget hosts that have been idle for HOST_STATE_IDLE_S so the maps don't grow unbounded"""
+        now = time.monotonic()
+        if now < self._host_sweep_at:
+            return
+        self._host_sweep_at = now + HOST_STATE_IDLE_S / 5
+        
+        cutoff = now - HOST_STATE_IDLE_S
+        for host in [host for host, bucket in self._host_buckets.items()
+                     if bucket.idle
+                     and self._host_next_at.get(host, 0) < cutoff
+                     and self._host_retry_at.get(host, 0) < now]:
+            del self._host_buckets[host]
+            self._host_next_at.pop(host, None)
+            self._host_retry_at.pop(host, None)
+        # Retry-After from hosts that never got a slot (e.g. only seen by the Zyte tier)
+        for host in [host for host, retry_at in self._host_retry_at.items()
+                     if retry_at < now and host not in self._host_buckets]:
+            del self._host_retry_at[host]
+    
+    def _note_retry_after(self, url: str, response: aiohttp.ClientResponse):
+        """Remember a rate-limited host's Retry-After so its next request waits it out"""
+        retry_after = response.headers.get("Retry-After")
+        if not retry_after:
+            return
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                return
+        host = _urlparts(url)[0]
+        self._host_retry_at[host] = time.monotonic() + min(max(delay, 0), RETRY_AFTER_MAX_S)
+    
+    async def scrape_with_retry(self, url: str, scrape_func: Optional[Callable] = None) -> Dict[str, Any]:
+        """Run a scrape under the global concurrency cap, retrying transient failures with backoff"""
+        scrape_func = scrape_func or self.scrape_with_optimal_service
+        
+        # Don't re-run the whole pipeline (and its long timeouts) for a URL that just failed
+        cached_failure = self.cache.get_failure(url)
+        if cached_failure:
+            logger.debug("Skipping %s, failed recently: %s", url, cached_failure['error'])
+            return cached_failure
+        
+        async with SCRAPE_SEMAPHORE:
+            for attempt in range(SCRAPE_RETRIES):
+                try:
+                    result = await scrape_func(url)
+                    if not (result and result.get("retryable")):
+                        break
+                    logger.warning(f"Retryable failure for {url}: {result.get('error')}")
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    result = {"url": url, "error": str(e), "content": ""}
+                    logger.warning(f"Retryable exception for {url}: {str(e)}")
+                
+                if attempt < SCRAPE_RETRIES - 1:
+                    await asyncio.sleep(2 ** attempt + random.random())
+        
+        # Only final outcomes are recorded, so retries above never see their own failure
+        if result and result.get("error") and not result.get("content"):
+            self.cache.set_failure(url, result["error"])
+        
+        return result
+    
     def classify_site_complexity(self, url: str) -> str:
         """Determine which Zyte service to use based on URL complexity"""
-        domain = urlparse(url).netloc.lower()
-        path = urlparse(url).path.lower()
-        
-        # Academic/complex sites - use Scrapy Cloud (full browser rendering)
-        academic_patterns = ['sciencedirect', 'springer', 'wiley', 'pubmed', 
-                           'ncbi', 'ieee', 'jstor', 'elsevier', 'nature', 
-                           'academia.edu', 'researchgate', 'frontiers', 'oxford',
-                           'tandfonline', 'sage', 'nih.gov', 'acm.org']
-        if any(p in domain for p in academic_patterns):
-            return "scrapy_cloud"
-            
-        # News/medium complexity - use Zyte API (faster than Scrapy Cloud)
-        news_patterns = ['news', 'blog', 'times', 'post', '.gov', 'cnn', 
-                         'bbc', 'guardian', 'nytimes', 'washingtonpost',
-                         'medium.com', 'reuters', 'bloomberg']
-        if any(p in domain for p in news_patterns):
-            return "zyte_api"
+        domain, path, _ = _urlparts(url)
+        service = _classify_domain(domain)
+        if service:
+            return service
             
         # JavaScript-heavy sites - use Zyte API
-        js_patterns = ['angular', 'react', 'vue', 'spa', 'dashboard', 'app.']
-        if any(p in domain or p in path for p in js_patterns):
+        if _JS_SITE_RE.search(path):
             return "zyte_api"
             
         # Default to direct HTTP (for simple sites)
         return "direct_http"
     
-    async def scrape_with_optimal_service(self, url: str) -> Dict[str, Any]:
-        """Route the request to the optimal Zyte service based on site complexity"""
+    async def scrape_with_optimal_service(self, url: str, max_age_ms: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Route the request to the optimal Zyte service based on site complexity
+        
+        max_age_ms, if given, only accepts a cached result fetched within that window.
+        """
         # Check cache first
-        cached_content = self.cache.get_content(url)
+        cached_content = self.cache.get_content(url, max_age_ms)
         if cached_content:
-            logger.info(f"Cache hit for {url}")
+            logger.debug("Cache hit for %s", url)
             return cached_content
             
         # Determine the best service based on site complexity
         service_type = self.classify_site_complexity(url)
-        logger.info(f"Classified {url} as {service_type}")
+        logger.debug("Classified %s as %s", url, service_type)
         
         # Route to appropriate service
         if service_type == "direct_http":
@@ -78,95 +639,84 @@ class ZyteServiceRouter:
         else:  # scrapy_cloud
             result = await self.scrape_with_scrapy_cloud(url)
         
-        # Cache successful results with content
-        if result and result.get("content") and len(result.get("content", "")) > 200:
-            self.cache.set_content(url, result)
-            
+        self._cache_result(url, result)
         return result
     
+    def _cache_result(self, url: str, result: Dict[str, Any]):
+        """Cache a usable result for its site type's TTL, or briefly remember that the URL came back thin"""
+        if not result:
+            return
+        
+        # Cache successful results with content, fingerprinted once for the exact-match phase
+        if len(result.get("content") or "") > MIN_USABLE_CONTENT:
+            result["simhash"] = simhash64(result["content"])
+            self.cache.set_content(url, result, site_type=self.classify_website(url))
+            self.cache.record_domain_result(_urlparts(url)[0], False, BAD_DOMAIN_THRESHOLD)
+        elif not result.get("error"):
+            # Every strategy ran and found next to nothing; don't pay for Zyte/Playwright again right away
+            self.cache.set_failure(url, "Content too short", ttl=self.cache.ttls["negative"])
+            domain = _urlparts(url)[0]
+            if self.cache.record_domain_result(domain, True, BAD_DOMAIN_THRESHOLD):
+                logger.warning(f"Skipping {domain} in batch scrapes for a day: {BAD_DOMAIN_THRESHOLD} thin scrapes in a row")
+    
     async def scrape_with_http(self, url: str) -> Dict[str, Any]:
         """Simple HTTP scraping for basic sites"""
-        async with self.http_semaphore:
+        async with self._host_slot(url), self.http_semaphore:
             headers = {
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
                 "Accept": "text/html,application/xhtml+xml,application/xml",
                 "Accept-Language": "en-US,en;q=0.9"
             }
             
+            # Revalidate a previously fetched page instead of downloading and parsing it again
+            validators = self.cache.get_validators(url)
+            if validators:
+                if validators.get("etag"):
+                    headers["If-None-Match"] = validators["etag"]
+                if validators.get("last_modified"):
+                    headers["If-Modified-Since"] = validators["last_modified"]
+            
             session = await self.get_session()
             try:
-                async with session.get(url, headers=headers, timeout=30) as response:
+                async with session.get(url, headers=headers, timeout=HTTP_TIMEOUT) as response:
+                    await self._track_status(self._host_buckets[_urlparts(url)[0]], response.status)
+                    if response.status in RETRYABLE_STATUSES:
+                        self._note_retry_after(url, response)
+                    if response.status == 304 and validators:
+                        logger.debug("Not modified, reusing stored content for %s", url)
+                        self.cache.touch_validators(url, validators)
+                        return dict(validators["result"])
                     if response.status != 200:
-                        return {"url": url, "error": f"HTTP error: {response.status}", "content": ""}
-                        
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'html.parser')
-                    
-                    # Extract title
-                    title = soup.title.string if soup.title else ""
-                    
-                    # Try to find main content
-                    content = ""
-                    main_selectors = ['article', 'main', '.post-content', '.entry-content', 
-                                      '#content', '.content', '.article', '.post',
-                                      '#main-content', '.page-content', '.wiki-body-section',
-                                      '#mw-content-text', '.mw-parser-output']
-                    
-                    for selector in main_selectors:
-                        elements = soup.select(selector)
-                        if elements:
-                            for element in elements:
-                                # Skip tiny elements
-                                if len(element.get_text()) < 100:
-                                    continue
-                                    
-                                # Remove unwanted elements
-                                for tag in element.select('script, style, nav, .nav, footer, .footer, .comment, .sidebar, aside'):
-                                    tag.decompose()
-                                    
-                                element_text = element.get_text(separator=' ', strip=True)
-                                if len(element_text) > 200:  # Only use substantial content
-                                    content = element_text
-                                    break
+                        return {"url": url, "error": f"HTTP error: {response.status}", "content": "",
+                                "retryable": response.status in RETRYABLE_STATUSES}
                         
-                        if content:
-                            break
+                    raw = await response.read()
+                    title, content = await self._extract(raw, len(MAIN_SELECTORS), NOISE_CLASSES,
+                                                         _response_encoding(response, raw))
                     
-                    # Fallback to paragraphs if no content found
-                    if not content:
-                        paragraphs = []
-                        for p in soup.select('p'):
-                            p_text = p.get_text(strip=True)
-                            if len(p_text) > 40:  # Only include substantial paragraphs
-                                paragraphs.append(p_text)
-                        
-                        if paragraphs:
-                            content = ' '.join(paragraphs)
-                    
-                    # Last resort - get all text from body
-                    if not content or len(content) < 200:
-                        body = soup.find('body')
-                        if body:
-                            for tag in body.select('script, style, nav, header, footer'):
-                                tag.decompose()
-                            content = body.get_text(separator=' ', strip=True)
-                    
-                    # Clean up content
-                    content = re.sub(r'\s+', ' ', content).strip()
-                    
-                    return {
+                    result = {
                         "url": url,
                         "title": title,
                         "content": content,
                         "error": "" if content else "Failed to extract content"
                     }
+                    
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+                    if content and (etag or last_modified):
+                        self.cache.set_validators(url, etag, last_modified, result)
+                    
+                    return result
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"HTTP connection error for {url}: {str(e)}")
+                return {"url": url, "error": str(e), "content": "", "retryable": True}
             except Exception as e:
                 logger.error(f"HTTP scraping error for {url}: {str(e)}")
                 return {"url": url, "error": str(e), "content": ""}
     
     async def scrape_with_zyte_api(self, url: str) -> Dict[str, Any]:
         """Use Zyte API for medium-complexity sites (faster than Scrapy Cloud)"""
-        async with self.zyte_semaphore:
+        async with self._host_slot(url), self.zyte_semaphore:
             session = await self.get_session()
             headers = {
                 "Content-Type": "application/json",
@@ -176,6 +726,8 @@ class ZyteServiceRouter:
             # Zyte API payload with improved settings
             payload = {
                 "url": url,
+                "article": True,
+                "articleOptions": {"extractFrom": "browserHtml"},
                 "browserHtml": True,
                 "javascript": True,
                 "timeout": 20,
@@ -188,70 +740,30 @@ class ZyteServiceRouter:
             try:
                 async with session.post(
                     "https://api.zyte.com/v1/extract", 
-                    json=payload,
+                    data=_json_dumps(payload),
                     headers=headers,
                     timeout=45
                 ) as response:
+                    await self._track_status(self.zyte_semaphore, response.status)
                     if response.status == 200:
-                        data = await response.json()
+                        data = _json_loads(await response.read())
+                        
+                        article = data.get("article") or {}
+                        article_body = article.get("articleBody") or ""
                         
+                        # Zyte's own article extraction is enough; skip parsing browserHtml ourselves
+                        if len(article_body) >= 200:
+                            content = WHITESPACE_RE.sub(' ', article_body).strip()
+                            title = article.get("headline") or data.get("title", "")
                         # Extract and clean content from browserHtml
-                        if data.get("browserHtml"):
+                        elif data.get("browserHtml"):
                             html = data.get("browserHtml", "")
-                            soup = BeautifulSoup(html, 'html.parser')
-                            
-                            # Extract title
-                            title = data.get("title", "")
-                            if not title and soup.title:
-                                title = soup.title.string
-                            
-                            # Extract main content using same selectors as HTTP scraper
-                            content = ""
-                            main_selectors = ['article', 'main', '.post-content', '.entry-content', 
-                                            '#content', '.content', '.article', '.post']
-                            
-                            for selector in main_selectors:
-                                elements = soup.select(selector)
-                                if elements:
-                                    for element in elements:
-                                        # Remove unwanted elements
-                                        for tag in element.select('script, style, nav, footer, aside'):
-                                            tag.decompose()
-                                            
-                                        element_text = element.get_text(separator=' ', strip=True)
-                                        if len(element_text) > 200:
-                                            content = element_text
-                                            break
-                                
-                                if content:
-                                    break
-                            
-                            # Fallback to paragraphs
-                            if not content:
-                                paragraphs = []
-                                for p in soup.select('p'):
-                                    p_text = p.get_text(strip=True)
-                                    if len(p_text) > 40:
-                                        paragraphs.append(p_text)
-                                
-                                if paragraphs:
-                                    content = ' '.join(paragraphs)
-                            
-                            # If no content found with selectors or paragraphs, use full text
-                            if not content:
-                                body = soup.find('body')
-                                if body:
-                                    # Clean the body
-                                    for tag in body.select('script, style, nav, header, footer'):
-                                        tag.decompose()
-                                    content = body.get_text(separator=' ', strip=True)
-                            
-                            # Clean up content
-                            content = re.sub(r'\s+', ' ', content).strip()
+                            page_title, content = await self._extract(html, len(ZYTE_MAIN_SELECTORS))
+                            title = data.get("title", "") or page_title
                         else:
                             # Use other fields if browserHtml not available
-                            content = data.get("article", {}).get("body", "")
-                            title = data.get("article", {}).get("headline", data.get("title", ""))
+                            content = article_body
+                            title = article.get("headline", data.get("title", ""))
                         
                         return {
                             "url": url,
@@ -262,142 +774,224 @@ class ZyteServiceRouter:
                     else:
                         error_text = await response.text()
                         logger.error(f"Zyte API error: {response.status}, {error_text[:200]}")
-                        return {"url": url, "error": f"API error: {response.status}", "content": ""}
+                        return {"url": url, "error": f"API error: {response.status}", "content": "",
+                                "retryable": response.status in RETRYABLE_STATUSES}
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"Zyte API connection error for {url}: {str(e)}")
+                return {"url": url, "error": str(e), "content": "", "retryable": True}
             except Exception as e:
                 logger.error(f"Error with Zyte API for {url}: {str(e)}")
                 return {"url": url, "error": str(e), "content": ""}
     
     async def scrape_with_scrapy_cloud(self, url: str) -> Dict[str, Any]:
-        """Use Scrapy Cloud for complex academic sites (reserve this for hardest sites)"""
+        """
+        Use Scrapy Cloud for complex academic sites (reserve this for hardest sites)
+        
+        URLs requested close together are coalesced into one spider run, so N
+        URLs pay the spider startup cost once per CLOUD_BATCH_SIZE rather than
+        N times. The batch window is adaptive: it closes once the batch is full
+        or arrivals go quiet, so a lone URL is sent almost immediately.
+        """
+        loop = asyncio.get_running_loop()
+        if self._cloud_batcher_task is None or self._cloud_batcher_task.done():
+            self._cloud_batcher_task = loop.create_task(self._cloud_batcher())
+        
+        future = loop.create_future()
+        self._cloud_pending.append((url, future))
+        self._cloud_wakeup.set()
+        self._cloud_arrival.set()
+        return await future
+    
+    async def _cloud_batcher(self):
+        """Background task: group pending Scrapy Cloud URLs into batches and launch a job for each"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._cloud_wakeup.wait()
+            
+            # Keep the batch open while URLs keep arriving, until it's full or the max wait is up
+            deadline = loop.time() + CLOUD_BATCH_MAX_WAIT_S
+            while len(self._cloud_pending) < CLOUD_BATCH_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                self._cloud_arrival.clear()
+                try:
+                    await asyncio.wait_for(self._cloud_arrival.wait(), min(CLOUD_BATCH_QUIET_S, remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            pending = self._cloud_pending[:CLOUD_BATCH_SIZE]
+            del self._cloud_pending[:CLOUD_BATCH_SIZE]
+            if not self._cloud_pending:
+                self._cloud_wakeup.clear()
+            
+            # Jobs run concurrently up to the cloud slot limit; keep a reference so they aren't collected
+            task = loop.create_task(self._run_cloud_batch(pending))
+            self._cloud_jobs.add(task)
+            task.add_done_callback(self._cloud_jobs.discard)
+    
+    async def _run_cloud_batch(self, pending: List[Tuple[str, asyncio.Future]]):
+        """Scrape a batch of URLs in one Scrapy Cloud job and resolve each caller's future"""
+        urls = list(dict.fromkeys(url for url, _ in pending))
+        try:
+            results = await self._scrape_batch_with_scrapy_cloud(urls)
+        except Exception as e:
+            logger.error(f"Exception in Scrapy Cloud scraping: {str(e)}")
+            results = {url: {"url": url, "error": str(e), "content": ""} for url in urls}
+        except asyncio.CancelledError:
+            for _, future in pending:
+                future.cancel()
+            raise
+        
+        for url, future in pending:
+            if not future.done():
+                future.set_result(results[url])
+    
+    async def _scrape_batch_with_scrapy_cloud(self, urls: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Submit one spider job for all urls and map the returned items back by start URL"""
+        def failed(error: str) -> Dict[str, Dict[str, Any]]:
+            return {url: {"url": url, "error": error, "content": ""} for url in urls}
+        
         async with self.cloud_semaphore:
             session = await self.get_session()
             job_timestamp = int(time.time())
             job_random = random.randint(10000, 99999)
             unique_job_id = f"{job_timestamp}-{job_random}"
+            start_urls = json.dumps(urls)
             
             # Prepare request data for Scrapy Cloud
             data = {
                 "project": int(self.project_id),
                 "spider": "content_spider",
                 "jobid": unique_job_id,
-                "start_url": url
+                "start_urls": start_urls
             }
             
             # API key in URL params
             params = {
                 "apikey": self.api_key,
-                "spider_args": f"start_url={url}"
+                "spider_args": f"start_urls={start_urls}"
             }
             
-            try:
-                # Submit the job to Scrapy Cloud
-                async with session.post(
-                    "https://app.zyte.com/api/run.json",
-                    data=data,
-                    params=params,
-                    timeout=30
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        job_id = data.get("jobid")
-                        if job_id:
-                            logger.info(f"Scheduled Scrapy Cloud job: {job_id} for {url}")
-                            
-                            # Wait for job to complete
-                            job_finished = await self._wait_for_job(job_id)
-                            if job_finished:
-                                items = await self._get_job_items(job_id)
-                                
-                                if items:
-                                    # Process the first item
-                                    if isinstance(items, list):
-                                        if items and isinstance(items[0], list):  # Nested list
-                                            item = items[0][0] if items[0] else {}
-                                        else:  # Flat list
-                                            item = items[0] if items else {}
-                                    else:
-                                        item = {}
-                                    
-                                    content = item.get("content", "")
-                                    title = item.get("title", "")
-                                    
-                                    if content:
-                                        # Clean content
-                                        content = self._clean_content(content)
-                                    
-                                    return {
-                                        "url": url,
-                                        "title": title,
-                                        "content": content,
-                                        "error": "" if content else "Empty content from Scrapy Cloud"
-                                    }
-                                else:
-                                    return {"url": url, "error": "No items returned from Scrapy Cloud", "content": ""}
-                            else:
-                                return {"url": url, "error": "Scrapy Cloud job timed out or failed", "content": ""}
-                        else:
-                            return {"url": url, "error": "Failed to start Scrapy Cloud job", "content": ""}
-                    else:
-                        text = await response.text()
-                        logger.error(f"Error scheduling spider: {response.status}, {text}")
-                        return {"url": url, "error": f"API error: {response.status}", "content": ""}
-            except Exception as e:
-                logger.error(f"Exception in Scrapy Cloud scraping: {str(e)}")
-                return {"url": url, "error": str(e), "content": ""}
+            # Submit the job to Scrapy Cloud
+            async with session.post(
+                "https://app.zyte.com/api/run.json",
+                data=data,
+                params=params,
+                timeout=30
+            ) as response:
+                if response.status != 200:
+                    text = await response.text()
+                    logger.error(f"Error scheduling spider: {response.status}, {text}")
+                    return failed(f"API error: {response.status}")
+                data = _json_loads(await response.read())
+            
+            job_id = data.get("jobid")
+            if not job_id:
+                return failed("Failed to start Scrapy Cloud job")
+            logger.info(f"Scheduled Scrapy Cloud job: {job_id} for {len(urls)} URLs")
+            
+            # Wait for job to complete; a bigger job gets proportionally longer
+            extra_urls = len(urls) - 1
+            if not await self._wait_for_job(job_id, timeout=JOB_TIMEOUT_S + JOB_TIMEOUT_PER_URL_S * extra_urls):
+                return failed("Scrapy Cloud job timed out or failed")
+            items = await self._get_job_items(job_id, timeout=JOB_ITEMS_TIMEOUT_S + JOB_ITEMS_TIMEOUT_PER_URL_S * extra_urls)
+        
+        if not items:
+            return failed("No items returned from Scrapy Cloud")
+        
+        # Items may come back nested; the spider tags each one with the URL it was started from
+        items_by_url = {}
+        for entry in items if isinstance(items, list) else []:
+            for item in entry if isinstance(entry, list) else [entry]:
+                if isinstance(item, dict):
+                    items_by_url.setdefault(item.get("start_url") or item.get("url"), item)
+        if len(urls) == 1 and urls[0] not in items_by_url and items_by_url:
+            # Older spider builds don't tag items, and a redirect changes the url
+            items_by_url[urls[0]] = next(iter(items_by_url.values()))
+        
+        results = {}
+        for url in urls:
+            item = items_by_url.get(url)
+            if item is None:
+                results[url] = {"url": url, "error": "No item returned for URL from Scrapy Cloud", "content": ""}
+                continue
+            
+            content = item.get("content", "")
+            title = item.get("title", "")
+            
+            if content:
+                # Clean content
+                content = self._clean_content(content)
+            
+            results[url] = {
+                "url": url,
+                "title": title,
+                "content": content,
+                "error": "" if content else "Empty content from Scrapy Cloud"
+            }
+        return results
 
     def _clean_content(self, content: str) -> str:
         """Clean content by removing boilerplate and normalizing spacing"""
         # Remove excessive whitespace
-        content = re.sub(r'\s+', ' ', content).strip()
+        content = WHITESPACE_RE.sub(' ', content).strip()
         
         # Remove common boilerplate text
-        patterns_to_remove = [
-            r'Copyright ©.*?(\.|$)',
-            r'All rights reserved\.?',
-            r'Terms (of|and) (use|service|conditions).*?(\.|$)',
-            r'Privacy Policy\.?',
-            r'Cookie Policy\.?',
-            r'\d+ views',
-            r'\d+ comments',
-            r'Share this:',
-            r'Follow us on:',
-            r'Last updated:.*?(\.|$)'
-        ]
-        
-        for pattern in patterns_to_remove:
-            content = re.sub(pattern, '', content, flags=re.IGNORECASE)
+        for pattern in _BOILERPLATE_RES:
+            content = pattern.sub('', content)
         
         return content.strip()
 
-    async def _wait_for_job(self, job_id: str, timeout: int = 90) -> bool:
-        """Wait for a Scrapy Cloud job to complete"""
-        start_time = time.time()
-        polling_interval = 2  # Start with 2 seconds
+    async def _wait_for_job(self, job_id: str, timeout: int = JOB_TIMEOUT_S) -> bool:
+        """
+        Wait for a Scrapy Cloud job to complete
         
-        while (time.time() - start_time) < timeout:
-            status = await self._check_job_status(job_id)
-            
-            if status == "finished":
-                return True
-            elif status in ["error", "deleted", "failed"]:
-                return False
-                
-            # Wait before polling again
-            await asyncio.sleep(polling_interval)
-            # Increase polling interval up to 10 seconds
-            polling_interval = min(10, polling_interval * 1.5)
+        The job is settled by the job-finished webhook when enabled, otherwise
+        by the shared poller that checks every pending job in one request.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending_jobs[job_id] = future
+        if not settings.scraper.job_webhook_active and (self._job_poller_task is None or self._job_poller_task.done()):
+            self._job_poller_task = loop.create_task(self._poll_pending_jobs())
         
-        return False  # Timeout
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Scrapy Cloud job {job_id} not settled after {timeout}s")
+            # One last direct look before giving up
+            return await self._check_job_status(job_id) == "finished"
+        finally:
+            self._pending_jobs.pop(job_id, None)
+    
+    async def _poll_pending_jobs(self):
+        """Background task: settle every pending Scrapy Cloud job with one jobs/list.json call per interval"""
+        while self._pending_jobs:
+            await asyncio.sleep(JOB_POLL_INTERVAL_S)
+            states = await self._check_job_states(list(self._pending_jobs))
+            for job_id, state in (states or {}).items():
+                if state == "finished":
+                    self.notify_job_finished(job_id, True)
+                elif state in ["error", "deleted", "failed"]:
+                    self.notify_job_finished(job_id, False)
+    
+    def notify_job_finished(self, job_id: str, succeeded: bool) -> bool:
+        """Wake the scrape waiting on job_id; returns False if nothing was waiting for it"""
+        future = self._pending_jobs.pop(job_id, None)
+        if future is None or future.done():
+            return False
+        future.set_result(succeeded)
+        return True
 
-    async def _check_job_status(self, job_id: str) -> str:
-        """Check status of a Scrapy Cloud job"""
+    async def _check_job_states(self, job_ids: List[str]) -> Optional[Dict[str, str]]:
+        """States of several Scrapy Cloud jobs from a single request, or None if the check failed"""
+        if not job_ids:
+            return {}
         session = await self.get_session()
         
-        params = {
-            "apikey": self.api_key,
-            "project": self.project_id,
-            "job": job_id
-        }
+        params = [("apikey", self.api_key), ("project", self.project_id)]
+        params.extend(("job", job_id) for job_id in job_ids)
         
         try:
             async with session.get(
@@ -406,19 +1000,33 @@ class ZyteServiceRouter:
                 timeout=10
             ) as response:
                 if response.status == 200:
-                    data = await response.json()
-                    jobs = data.get("jobs", [])
-                    if jobs:
-                        return jobs[0].get("state", "unknown")
-                    return "not_found"
+                    data = _json_loads(await response.read())
+                    return {job.get("id"): job.get("state", "unknown") for job in data.get("jobs", [])}
                 else:
                     logger.error(f"Error checking job status: {response.status}")
-                    return "error"
+                    return None
         except Exception as e:
             logger.error(f"Exception checking job status: {str(e)}")
+            return None
+
+    async def _check_job_status(self, job_id: str) -> str:
+        """Check status of a Scrapy Cloud job"""
+        states = await self._check_job_states([job_id])
+        if states is None:
             return "error"
+        return states.get(job_id, "not_found")
 
-    async def _get_job_items(self, job_id: str) -> List[Dict]:
+    @staticmethod
+    def _parse_item_line(line: Union[bytes, bytearray], items: List[Dict]):
+        """Decode one JSONL item straight from bytes and append it to items"""
+        if not line.strip():
+            return
+        try:
+            items.append(_json_loads(line))
+        except json.JSONDecodeError:
+            logger.warning(f"Failed to parse item: {line[:100]}...")
+
+    async def _get_job_items(self, job_id: str, timeout: int = JOB_ITEMS_TIMEOUT_S) -> List[Dict]:
         """Get items from a completed Scrapy Cloud job"""
         session = await self.get_session()
         
@@ -427,27 +1035,30 @@ class ZyteServiceRouter:
         
         params = {
             "apikey": self.api_key,
-            "format": "json"
+            "format": "jl"
         }
         
         try:
             async with session.get(
                 f"https://storage.scrapinghub.com/items/{storage_job_id}",
                 params=params,
-                timeout=15
+                timeout=timeout
             ) as response:
                 if response.status == 200:
-                    text = await response.text()
-                    
-                    # Parse JSONL format
+                    # Parse the JSONL body as it streams in, one item per line
                     items = []
-                    for line in text.strip().split('\n'):
-                        if not line.strip():
+                    pending = bytearray()
+                    async for chunk in response.content.iter_chunked(JOB_ITEMS_CHUNK_SIZE):
+                        # Only the new chunk is searched; a large item just accumulates until its line ends
+                        newline = chunk.rfind(b"\n")
+                        if newline == -1:
+                            pending += chunk
                             continue
-                        try:
-                            items.append(json.loads(line))
-                        except json.JSONDecodeError:
-                            logger.warning(f"Failed to parse item: {line[:100]}...")
+                        pending += chunk[:newline]
+                        for line in pending.split(b"\n"):
+                            self._parse_item_line(line, items)
+                        pending = bytearray(chunk[newline + 1:])
+                    self._parse_item_line(pending, items)
                     
                     return items
                 else:
@@ -457,20 +1068,53 @@ class ZyteServiceRouter:
             logger.error(f"Exception getting job items: {str(e)}")
             return []
 
-    async def _scrape_with_fallback_chain(self, url: str, methods: List[Callable]) -> Dict[str, Any]:
-        """Try multiple scraping methods in sequence until one succeeds"""
+    async def _scrape_with_fallback_chain(self, url: str, methods: List[Callable],
+                                          min_content: int = 200) -> Dict[str, Any]:
+        """
+        Race scraping methods, launching each next one if the earlier ones haven't succeeded in time
+        
+        Methods start FALLBACK_STAGGER_S apart, or straight away once a running
+        method fails. The first result with more than min_content characters
+        wins and the others are cancelled; otherwise the longest result is returned.
+        """
+        pending = set()
+        best = None
         last_error = None
+        launched = 0
         
-        for method in methods:
-            try:
-                result = await method(url)
-                if result and result.get("content") and len(result.get("content", "")) > 200:
-                    # Found valid content
-                    return result
-            except Exception as e:
-                last_error = str(e)
-                logger.warning(f"Method {method.__name__} failed for {url}: {str(e)}")
-                continue
+        try:
+            while launched < len(methods) or pending:
+                timeout = None
+                if launched < len(methods):
+                    method = methods[launched]
+                    pending.add(asyncio.create_task(method(url), name=method.__name__))
+                    if launched < len(methods) - 1:
+                        timeout = FALLBACK_STAGGER_S[min(launched, len(FALLBACK_STAGGER_S) - 1)]
+                    launched += 1
+                
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        last_error = str(e)
+                        logger.warning(f"Method {task.get_name()} failed for {url}: {str(e)}")
+                        continue
+                    
+                    content = (result or {}).get("content") or ""
+                    if len(content) > min_content:
+                        # Found valid content
+                        return result
+                    if content and (best is None or len(content) > len(best["content"])):
+                        best = result
+                    elif result and result.get("error"):
+                        last_error = result["error"]
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        if best:
+            return best
         
         # All methods failed
         return {"url": url, "error": f"All methods failed: {last_error}", "content": ""}
@@ -481,7 +1125,7 @@ class ZyteServiceRouter:
 
     async def _scientific_http_scrape(self, url: str) -> Dict[str, Any]:
         """Specialized HTTP scraping for scientific content"""
-        async with self.http_semaphore:
+        async with self._host_slot(url), self.http_semaphore:
             headers = {
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36",
                 "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
@@ -499,38 +1143,31 @@ class ZyteServiceRouter:
             session = await self.get_session()
             try:
                 # Add timeout and allow redirects
-                async with session.get(url, headers=headers, timeout=45, allow_redirects=True) as response:
+                async with session.get(url, headers=headers, timeout=HTTP_TIMEOUT, allow_redirects=True) as response:
+                    await self._track_status(self._host_buckets[_urlparts(url)[0]], response.status)
+                    if response.status in RETRYABLE_STATUSES:
+                        self._note_retry_after(url, response)
                     if response.status != 200:
-                        return {"url": url, "error": f"HTTP error: {response.status}", "content": ""}
+                        return {"url": url, "error": f"HTTP error: {response.status}", "content": "",
+                                "retryable": response.status in RETRYABLE_STATUSES}
                         
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'html.parser')
+                    raw = await response.read()
+                    html = raw.decode(_response_encoding(response, raw), errors='replace')
+                    soup = await asyncio.get_running_loop().run_in_executor(None, _parse_html, html)
                     title = soup.title.string if soup.title else ""
                     content = ""
                     
-                    # Academic-specific content selectors (expanded)
-                    academic_selectors = [
-                        'article', '.article', '.article-body', '.paper', '.content-block',
-                        '#content', '.content', '.main-content', '.article-content',
-                        '.publication-content', '.research-article', '.fulltext-view',
-                        '.article-fulltext', '.article__body', '.article__sections',
-                        '#main-content', '.section-container', '.page-content',
-                        '#abstract', '.abstract', '.abstractSection', '.abstract-content',
-                        '#body', '.body', '.fulltext', '.full-text', '#full-text-content',
-                        '.article-text', '.article-section__content', '.article-section'
-                    ]
+                    # Remove unwanted elements once for the whole page rather than per candidate
+                    for unwanted in soup.select(_ACADEMIC_UNWANTED_CSS):
+                        if not unwanted.decomposed:  # Already gone with a decomposed ancestor
+                            unwanted.decompose()
                     
                     # Try to find the content with multiple approaches
-                    # 1. First try specific selectors
-                    for selector in academic_selectors:
+                    # 1. First try academic-specific selectors
+                    for selector in _ACADEMIC_SELECTORS:
                         elements = soup.select(selector)
                         if elements:
                             for element in elements:
-                                # Remove unwanted elements
-                                for unwanted in element.select('nav, .nav, header, footer, .header, .footer, .figure, .fig, .author-info, .references, aside, .aside, .metrics, .extra, .supplementary, .article-tools'):
-                                    if unwanted:
-                                        unwanted.decompose()
-                                
                                 # Extract paragraphs for better text quality
                                 paragraphs = [p.get_text(strip=True) for p in element.select('p')]
                                 if paragraphs and sum(len(p) for p in paragraphs) > 200:
@@ -562,10 +1199,10 @@ class ZyteServiceRouter:
                                 break
                     
                     # Clean up content
-                    content = re.sub(r'\s+', ' ', content).strip()
+                    content = WHITESPACE_RE.sub(' ', content).strip()
                     
                     # Debug log length of extracted content
-                    logger.info(f"Extracted {len(content)} chars from academic URL: {url}")
+                    logger.debug("Extracted %d chars from academic URL: %s", len(content), url)
                     
                     return {
                         "url": url,
@@ -573,14 +1210,17 @@ class ZyteServiceRouter:
                         "content": content,
                         "error": "" if content else "Failed to extract scientific content"
                     }
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"Scientific HTTP connection error for {url}: {str(e)}")
+                return {"url": url, "error": str(e), "content": "", "retryable": True}
             except Exception as e:
                 logger.error(f"Scientific HTTP scraping error for {url}: {str(e)}")
                 return {"url": url, "error": str(e), "content": ""}
 
     async def _zyte_scrape(self, url: str) -> Dict[str, Any]:
         """Use Zyte API with concurrency control"""
-        async with self.zyte_semaphore:
-            return await self.scrape_with_zyte_api(url)
+        # scrape_with_zyte_api already holds a zyte slot; taking a second one here could deadlock
+        return await self.scrape_with_zyte_api(url)
 
     async def _playwright_scrape(self, url: str) -> Dict[str, Any]:
         """Attempt to use Playwright if available"""
@@ -640,107 +1280,113 @@ class ZyteServiceRouter:
 
     def classify_website(self, url: str) -> str:
         """Classify websites to determine the best scraping approach"""
-        parsed_url = urlparse(url)
-        domain = parsed_url.netloc.lower()
-        path = parsed_url.path.lower()
-        
-        # 1. TLD-based classification
-        scientific_tlds = ['.edu', '.ac.uk', '.ac.jp', '.ac.', '.research.']
-        if any(tld in domain for tld in scientific_tlds):
-            return 'scientific'
-            
-        # 2. Domain name pattern matching (scientific publishers)
-        scientific_patterns = [
-            'science', 'research', 'journal', 'academic', 'scholar', 
-            'university', 'institute', 'lab', 'proceedings', 'publications',
-            'springer', 'wiley', 'elsevier', 'nature', 'cell', 'pubmed', 
-            'sciencedirect', 'frontiers', 'arxiv', 'ieee', 'acm', 'jstor'
-        ]
-        
-        if any(pattern in domain for pattern in scientific_patterns):
-            return 'scientific'
-            
-        # 3. URL path analysis
-        scientific_paths = [
-            '/article/', '/journal/', '/abstract/', '/doi/', '/publication/', 
-            '/paper/', '/research/', '/science/', '/content/', '/fulltext/'
-        ]
-        
-        if any(sci_path in path for sci_path in scientific_paths):
-            return 'scientific'
-        
-        # 4. News site detection
-        news_patterns = [
-            'news', 'times', 'post', 'tribune', 'herald', 
-            'guardian', 'bbc', 'cnn', 'nyt', 'reuters', 'bloomberg'
-        ]
-        
-        if any(pattern in domain for pattern in news_patterns):
-            return 'news'
-        
-        # 5. Complex site detection (JavaScript-heavy sites)
-        complex_patterns = [
-            'angular', 'react', 'vue', 'spa', 'dashboard', 'app.',
-            'facebook', 'twitter', 'linkedin', 'instagram', 'youtube'
-        ]
-        
-        if any(pattern in domain or pattern in path for pattern in complex_patterns):
-            return 'complex'
+        domain, path, _ = _urlparts(url)
+        
+        # Domain verdicts are memoized; the path is checked per URL. Lowest priority wins.
+        priority = min(_domain_site_priority(domain), _site_priority(path, 'path'))
+        if priority < len(_SITE_CATEGORIES):
+            return _SITE_CATEGORIES[priority]
             
         # Default to standard
         return 'standard'
 
-async def scrape_urls_in_parallel(self, urls: List[str], max_concurrent: int = 3) -> List[Dict[str, Any]]:
-    """Scrape multiple URLs in parallel with optimal service selection"""
-    from app.services.worker_pool import ScraperWorkerPool
-    
-    # Use worker pool for better performance and stability
-    worker_pool = ScraperWorkerPool(max_workers=max_concurrent, max_per_domain=2)
-    results = []
-    
-    async def scrape_url_with_strategy(url: str) -> Dict[str, Any]:
-        """Select and apply the best strategy for each URL"""
-        # First check cache
-        cached_content = self.cache.get_content(url)
-        if cached_content:
-            logger.info(f"Cache hit for {url}")
-            return cached_content
-            
-        # Use specialized scientific scraping for academic sites
-        site_type = self.classify_website(url)
-        logger.info(f"Classified {url} as {site_type}")
+    async def iter_scrape_urls(self, urls: List[str], max_concurrent: int = 3) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Scrape multiple URLs in parallel with optimal service selection, yielding results as they finish
         
-        if site_type == 'scientific':
-            try:
-                # Try direct scientific scraping first as it's faster
-                result = await self._scientific_http_scrape(url)
-                if result and result.get("content") and len(result.get("content", "")) > 300:
-                    logger.info(f"Scientific scraping succeeded for {url}")
-                    return result
-                    
-                # If direct scraping failed or returned limited content, try Zyte API
-                if self.api_key and not self.api_key.startswith('ENTER_YOUR'):
-                    result = await self.scrape_with_zyte_api(url)
-                    if result and result.get("content") and len(result.get("content", "")) > 300:
-                        return result
+        Only results with more than MIN_USABLE_CONTENT characters of content are
+        yielded, so callers don't re-check them. URLs still in flight are
+        cancelled if the caller stops iterating early.
+        """
+        # Global and per-host caps provide the backpressure; _host_slot adds the time-based throttle
+        global_semaphore = asyncio.Semaphore(max_concurrent)
+        host_semaphores = defaultdict(lambda: asyncio.Semaphore(2))
+        
+        async def scrape_url_with_strategy(url: str) -> Dict[str, Any]:
+            """Select and apply the best strategy for each URL"""
+            # First check cache
+            cached_content = self.cache.get_content(url)
+            if cached_content:
+                logger.debug("Cache hit for %s", url)
+                return cached_content
                 
-                # As last resort for academic content, try basic HTTP
-                return await self._http_scrape(url)
+            # Use specialized scientific scraping for academic sites
+            site_type = self.classify_website(url)
+            logger.debug("Classified %s as %s", url, site_type)
+            
+            if site_type == 'scientific':
+                # Direct scientific scraping first as it's faster, then Zyte API, then basic HTTP;
+                # later tiers start speculatively if the earlier ones are slow (e.g. stuck on a paywall)
+                methods = [self._scientific_http_scrape]
+                if self.api_key and not self.api_key.startswith('ENTER_YOUR'):
+                    methods.append(self.scrape_with_zyte_api)
+                methods.append(self._http_scrape)
+                result = await self._scrape_with_fallback_chain(url, methods, min_content=300)
+                self._cache_result(url, result)
+                return result
+            else:
+                # For non-academic content use standard approach
+                return await self.scrape_with_optimal_service(url)
+        
+        async def scrape_url_bounded(url: str) -> Optional[Dict[str, Any]]:
+            """Apply the strategy with retry/backoff under the batch's global and per-host caps, None if too short"""
+            async with global_semaphore, host_semaphores[_urlparts(url)[0]]:
+                result = await self.scrape_with_retry(url, scrape_url_with_strategy)
+            # Drop thin results here so they are never held for the caller
+            if not result or len(result.get("content") or "") <= MIN_USABLE_CONTENT:
+                return None
+            logger.debug("Completed scraping: %s", result.get("url"))
+            return result
+        
+        # Don't launch any worker for domains that keep serving captchas or login walls
+        bad_domains = {domain for domain in {_urlparts(url)[0] for url in urls} if self.cache.is_bad_domain(domain)}
+        if bad_domains:
+            kept_urls = [url for url in urls if _urlparts(url)[0] not in bad_domains]
+            logger.info(f"Skipping {len(urls) - len(kept_urls)} URLs from domains that recently returned no content")
+            urls = kept_urls
+        
+        # Resolve each host once before the workers start connecting
+        await self.warm_dns(urls)
+        
+        tasks = [asyncio.create_task(scrape_url_bounded(url)) for url in urls]
+        scraped = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    result = await next_done
+                except Exception as e:
+                    logger.error(f"Task error: {str(e)}")
+                    continue
                 
-            except Exception as e:
-                logger.error(f"Error scraping academic content from {url}: {str(e)}")
-                # Fallback to basic HTTP scraping
-                return await self._http_scrape(url)
-        else:
-            # For non-academic content use standard approach
-            return await self.scrape_with_optimal_service(url)
-    
-    # Process URLs with worker pool
-    # This approach is more stable than using as_completed directly
-    results = await worker_pool.scrape_urls(urls, scrape_url_with_strategy)
-    
-    # Filter out results without content
-    valid_results = [r for r in results if r and r.get("content") and len(r.get("content", "")) > 200]
-    logger.info(f"Successfully scraped {len(valid_results)} out of {len(urls)} URLs")
-    
-    return valid_results
\ No newline at end of file
+                if result is not None:
+                    scraped += 1
+                    yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+            logger.info(f"Successfully scraped {scraped} out of {len(urls)} URLs")
+    
+    async def scrape_urls_in_parallel(self, urls: List[str], max_concurrent: int = 3) -> List[Dict[str, Any]]:
+        """Scrape multiple URLs in parallel with optimal service selection"""
+        return [result async for result in self.iter_scrape_urls(urls, max_concurrent)]
+
+# ----- Singleton Router Management -----
+
+_zyte_router = None
+
+def get_zyte_router() -> ZyteServiceRouter:
+    """Get or create the process-wide ZyteServiceRouter so its connection pool is reused"""
+    global _zyte_router
+    if _zyte_router is None:
+        _zyte_router = ZyteServiceRouter(
+            api_key=settings.ZYTE_API_KEY,
+            project_id=settings.ZYTE_PROJECT_ID
+        )
+    return _zyte_router
+
+async def close_zyte_router():
+    """Close the shared router's session when the application shuts down"""
+    global _zyte_router
+    if _zyte_router:
+        await _zyte_router.close()
+        _zyte_router = None
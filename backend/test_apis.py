@@ -1,8 +1,8 @@
 import os
-import requests
-import json
+import asyncio
+import aiohttp
 from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer
+from app.services.embedding import get_embedding_model, ENCODE_BATCH_SIZE
 
 # Load environment variables
 load_dotenv()
@@ -10,18 +10,23 @@ load_dotenv()
 # Get API keys from environment
 zyte_api_key = os.getenv("ZYTE_API_KEY")
 
+# Encoded in one call, the way the service batches sentences
+EMBEDDING_TEST_SENTENCES = [f"Test sentence number {i} for the embedding model." for i in range(32)]
+
 def test_huggingface_embeddings():
     """Test if HuggingFace Sentence Transformers can load and create embeddings"""
     print("\nTesting HuggingFace Sentence Transformers...")
     try:
         print("Loading model - this may take a moment on first run...")
-        model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+        # Same loader as the service, so USE_ONNX_INT8 picks the quantized ONNX model here too
+        model = get_embedding_model()
         
-        # Try creating an embedding
-        embedding = model.encode("Hello world", convert_to_numpy=True)
+        # Try creating a batch of embeddings
+        embeddings = model.encode(EMBEDDING_TEST_SENTENCES, batch_size=ENCODE_BATCH_SIZE,
+                                  convert_to_numpy=True, normalize_embeddings=True)
         
-        if embedding is not None and len(embedding) > 0:
-            print(f"✅ HuggingFace model loaded successfully! (Vector dimension: {len(embedding)})")
+        if embeddings is not None and len(embeddings) == len(EMBEDDING_TEST_SENTENCES):
+            print(f"✅ HuggingFace model loaded successfully! (Vector dimension: {embeddings.shape[1]})")
             return True
         else:
             print("❌ Failed to generate embeddings.")
@@ -32,6 +37,10 @@ def test_huggingface_embeddings():
 
 def test_zyte_api():
     """Test if Zyte API key works by requesting extraction from a simple website"""
+    return asyncio.run(run_api_tests())
+
+async def check_zyte_api(session: aiohttp.ClientSession):
+    """Request an extraction from a simple website through the shared session"""
     print("\nTesting Zyte API...")
     try:
         url = "https://api.zyte.com/v1/extract"
@@ -44,25 +53,30 @@ def test_zyte_api():
             "browserHtml": True
         }
         
-        response = requests.post(
+        async with session.post(
             url,
-            auth=(zyte_api_key, ""),
+            auth=aiohttp.BasicAuth(zyte_api_key, ""),
             headers=headers,
-            data=json.dumps(payload)
-        )
-        
-        print(f"Status Code: {response.status_code}")
-        
-        if response.status_code == 200:
-            print("✅ Zyte API key is working correctly!")
-            return True
-        else:
-            print(f"❌ Zyte API error: {response.text}")
-            return False
+            json=payload
+        ) as response:
+            print(f"Status Code: {response.status}")
+            
+            if response.status == 200:
+                print("✅ Zyte API key is working correctly!")
+                return True
+            else:
+                print(f"❌ Zyte API error: {await response.text()}")
+                return False
     except Exception as e:
         print(f"❌ Zyte API error: {str(e)}")
         return False
 
+async def run_api_tests():
+    """Run the network checks over one keep-alive session"""
+    connector = aiohttp.TCPConnector(limit=100, limit_per_host=4, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        return await check_zyte_api(session)
+
 if __name__ == "__main__":
     print("API and Model Test Results")
     print("=========================")
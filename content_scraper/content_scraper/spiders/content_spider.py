@@ -1,22 +1,22 @@
 # spider.py
 import scrapy
-from bs4 import BeautifulSoup
+from selectolax.parser import HTMLParser
 import logging
+import json
 
 class ContentSpider(scrapy.Spider):
     name = "content_spider"
     
-    def __init__(self, start_url=None, *args, **kwargs):
+    def __init__(self, start_url=None, start_urls=None, *args, **kwargs):
         super(ContentSpider, self).__init__(*args, **kwargs)
-        # Log the received URL for debugging
-        self.logger.info(f"Spider initialized with URL: {start_url}")
+        # A batch of URLs arrives as a JSON list in start_urls, a single one in start_url
+        urls = json.loads(start_urls) if start_urls else [start_url]
+        # Log the received URLs for debugging
+        self.logger.info(f"Spider initialized with URLs: {urls}")
         
-        if start_url and start_url.startswith("http"):
-            self.start_urls = [start_url]
-        else:
-            self.logger.error(f"Invalid or missing start_url: {start_url}")
-            # Don't use example.com, this causes confusion
-            self.start_urls = []
+        self.start_urls = [url for url in urls if url and url.startswith("http")]
+        if len(self.start_urls) < len(urls):
+            self.logger.error(f"Invalid or missing start URLs in: {urls}")
     
     def start_requests(self):
         """Override to better handle empty URLs"""
@@ -25,28 +25,33 @@ class ContentSpider(scrapy.Spider):
             return
             
         for url in self.start_urls:
-            yield scrapy.Request(url, callback=self.parse)
+            # Remember the requested URL so results can be matched up after redirects
+            yield scrapy.Request(url, callback=self.parse, meta={"start_url": url})
     
     def parse(self, response):
         # Log successful request
         self.logger.info(f"Processing URL: {response.url}")
         
+        # Parse the page once; selection and cleaning all run on this tree
+        tree = HTMLParser(response.text)
+        
         # Get page content using various selectors
-        main_content = response.css('article, main, .content, #content, .post, .entry').get()
+        main_content = tree.css_first('article, main, .content, #content, .post, .entry')
         
         if main_content:
             # Clean HTML
-            soup = BeautifulSoup(main_content, 'html.parser')
-            for tag in soup(['script', 'style', 'nav', 'footer', 'header']):
-                tag.decompose()
-            content = soup.get_text(' ', strip=True)
+            main_content.strip_tags(['script', 'style', 'nav', 'footer', 'header'])
+            content = main_content.text(separator=' ', strip=True)
         else:
             # Fallback to paragraphs
-            paragraphs = response.css('p::text').getall()
+            paragraphs = [p.text(deep=False) for p in tree.css('p')]
             content = ' '.join(paragraphs)
         
+        title = tree.css_first('title')
+        
         yield {
             "url": response.url,
-            "title": response.css('title::text').get(),
+            "start_url": response.meta.get("start_url", response.url),
+            "title": title.text() if title else None,
             "content": content
         }
\ No newline at end of file